@@ -1,8 +1,29 @@
+import asyncio
 import base64
+import functools
+import glob
+import json
 import logging
 import importlib
-from typing import Dict, Optional, Union
-from pathlib import Path
+import itertools
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+)
+from pathlib import Path, PurePosixPath
+from urllib.parse import quote
 from O365 import (
     Account,
     MSGraphProtocol,
@@ -11,19 +32,62 @@ from O365 import (
     drive,
     sharepoint,
 )
-from O365.utils import Token, BaseTokenBackend
+from O365.utils import ApiComponent, Token, BaseTokenBackend
 from O365.utils.utils import (  # noqa: F401 pylint: disable=unused-import
     ME_RESOURCE,
+    NEXT_LINK_KEYWORD,
     USERS_RESOURCE,
     GROUPS_RESOURCE,
     SITES_RESOURCE,
 )
+from requests import Response
+from requests.exceptions import HTTPError
 from robot.api.deco import keyword
 
+from RPA._msgraph.hashes import (  # noqa: F401 pylint: disable=unused-import
+    FolderMirrorIndex,
+    QuickXorHash,
+)
+from RPA._msgraph.tokens import (  # noqa: F401 pylint: disable=unused-import
+    LockedFileTokenBackend,
+    MemoryTokenBackend,
+    RobocorpVaultTokenBackend,
+)
+from RPA._msgraph.transport import (  # noqa: F401 pylint: disable=unused-import
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TOKEN_REFRESH_MARGIN,
+    GRAPH_BATCH_LIMIT,
+    GraphBatch,
+    GraphRequestScheduler,
+    GraphTokenRefresher,
+    MSGraphConnection,
+)
+
 
 DEFAULT_REDIRECT_URI = "https://login.microsoftonline.com/common/oauth2/nativeclient"
 DEFAULT_TOKEN_PATH = Path("/temp")
 DEFAULT_PROTOCOL = MSGraphProtocol()
+DEFAULT_MAX_WORKERS = 8
+READ_ONLY_LIST_FIELDS = (
+    "id",
+    "Attachments",
+    "ContentType",
+    "Created",
+    "DocIcon",
+    "Edit",
+    "FolderChildCount",
+    "ItemChildCount",
+    "Modified",
+)
+UPLOAD_STATE_SUFFIX = ".upload-session.json"
+DEFAULT_STREAM_CHUNK_SIZE = 1024 * 1024
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+DOWNLOAD_PART_SUFFIX = ".part"
+DOWNLOAD_STATE_SUFFIX = ".download-state.json"
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_SIZE = 256
+ROOT_FOLDER_ALIASES = [None, "/", "\\", "root", "ROOT", ""]
 
 
 def import_table():
@@ -47,8 +111,8 @@ class MSGraphDownloadError(Exception):
     "Error when download fails."
 
 
-class RobocorpVaultTokenBackend(BaseTokenBackend):
-    "A simple Token backend that saves to Robocorp vault"
+class MSGraphUploadError(Exception):
+    "Error when upload fails."
 
 
 class SharedItem(drive.File):
@@ -68,6 +132,56 @@ class SharedItem(drive.File):
         return self.url
 
 
+class GraphObjectCache:
+    """Thread-safe LRU cache of Graph objects whose entries expire ``ttl``
+    seconds after being stored. A ``ttl`` of 0 disables the cache.
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_CACHE_TTL, max_size: int = DEFAULT_CACHE_SIZE
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached object or ``None`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> Any:
+        """Stores the object, evicting the least recently used ones if the
+        cache is full, and returns it.
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return value
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, value: Any) -> None:
+        """Removes every entry holding the given object."""
+        with self._lock:
+            for key in [k for k, (_, v) in self._entries.items() if v is value]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 class MSGraph:
     """
     The *MSGraph* library wraps the `O365 package`_, giving robots
@@ -90,6 +204,13 @@ class MSGraph:
     - Has relevant permissions enabled, check the `Microsoft Graph permissions reference`_
     for a list of permissions available to MS Graph apps.
 
+    Unattended robots can authenticate as the app itself instead, with the
+    client credentials flow, by giving the ``tenant_id`` and setting
+    ``app_only`` when configuring the client. The app then needs application
+    permissions granted by an administrator and no user has to sign in.
+    Keywords defaulting to the signed in user need a ``resource`` such as
+    ``users/<user-id>`` in this mode.
+
     .. TODO: Determine bundles of permissions needed for each keyword in the library.
 
     .. _O365 package: https://pypi.org/project/O365
@@ -113,32 +234,100 @@ class MSGraph:
         vault_backend: bool = False,
         vault_secret: Optional[str] = None,
         file_backend_path: Optional[Path] = DEFAULT_TOKEN_PATH,
+        token_backend: Optional[BaseTokenBackend] = None,
+        shared_token_file: bool = False,
+        tenant_id: Optional[str] = None,
+        app_only: bool = False,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        requests_per_second: Optional[float] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        token_refresh_margin: float = DEFAULT_TOKEN_REFRESH_MARGIN,
     ) -> None:
         """When importing the library to Robot Framework, you can set the
         ``client_id`` and ``client_secret``.
 
         :param client_id: Application client id.
         :param client_secret: Application client secret.
+        :param vault_backend: Boolean indicating if the token is kept in the
+         Robocorp Vault instead of a file.
+        :param vault_secret: Name of the Vault secret keeping the token.
+        :param file_backend_path: Folder of the file keeping the token,
+         ``None`` keeps the token only in memory.
+        :param token_backend: O365 token backend used instead of the file
+         or the Vault, for example a ``RobocorpVaultTokenBackend`` with a
+         custom vault.
+        :param shared_token_file: Boolean indicating if the token file is
+         shared by several processes running at the same time, which then
+         take turns to refresh the token instead of each refreshing it.
+        :param tenant_id: Directory (tenant) ID of the app, required with
+         ``app_only``.
+        :param app_only: Boolean indicating if the client authenticates as
+         the app with the client credentials flow.
+        :param cache_ttl: Seconds that looked up drives and folders are
+         reused before being requested again, 0 disables the cache.
+        :param cache_size: Maximum number of drives and folders cached.
+        :param max_retries: Maximum number of times a throttled or failed
+         request is retried.
+        :param requests_per_second: Maximum number of requests sent per
+         second to the tenant, shared by every library instance and thread,
+         not limited by default.
+        :param pool_size: Maximum number of connections kept open per host,
+         should be at least the ``max_workers`` used by keywords.
+        :param keep_alive: Boolean indicating if connections are reused
+         between requests.
+        :param token_refresh_margin: Seconds before the access token expires
+         when it is refreshed in the background, 0 disables the background
+         refresh. It is capped at half of the token lifetime.
 
         """
         self.logger = logging.getLogger(__name__)
-        # TODO: Implement a `TokenBackend` that uses Robocorp vault,
-        #       if implemented, returned refresh tokens are unnecessary.
-        if not vault_backend:
-            self.token_backend = FileSystemTokenBackend(
+        self._cache = GraphObjectCache(float(cache_ttl), int(cache_size))
+        self.max_retries = int(max_retries)
+        self.requests_per_second = (
+            float(requests_per_second) if requests_per_second else None
+        )
+        self.pool_size = int(pool_size)
+        self.keep_alive = keep_alive
+        self.token_refresh_margin = float(token_refresh_margin)
+        # The token is kept in memory, shared by the library instances using
+        # the same file or secret, and written there in the background.
+        if token_backend is not None:
+            self.token_backend = token_backend
+        elif shared_token_file and not vault_backend:
+            self.token_backend = LockedFileTokenBackend(
                 file_backend_path, "auth_token.txt"
             )
+        elif not vault_backend:
+            persistent_backend = None
+            if file_backend_path is not None:
+                persistent_backend = FileSystemTokenBackend(
+                    file_backend_path, "auth_token.txt"
+                )
+            self.token_backend = MemoryTokenBackend(
+                f"file:{persistent_backend}" if persistent_backend else "memory",
+                persistent_backend,
+            )
         elif vault_backend and not vault_secret:
             raise ValueError(
                 "Argument vault_secret cannot be blank if vault_backend set to True."
             )
         else:
-            raise NotImplementedError(
-                "Robocorp vault token backend not yet implemented."
+            self.token_backend = MemoryTokenBackend(
+                f"vault:{vault_secret}", RobocorpVaultTokenBackend(vault_secret)
             )
+        self._token_backend_given = token_backend is not None
+        self._user_token_backend = self.token_backend
         if client_id and client_secret:
             self.configure_msgraph_client(
-                client_id, client_secret, refresh_token, redirect_uri
+                client_id,
+                client_secret,
+                refresh_token,
+                redirect_uri,
+                tenant_id=tenant_id,
+                app_only=app_only,
             )
         else:
             self.client = None
@@ -150,32 +339,45 @@ class MSGraph:
 
     def _require_authentication(self):
         self._require_client()
+        con = self.client.con
+        if con.auth_flow_type == "credentials" and not self.client.is_authenticated:
+            # App-only tokens have no refresh token, a new one is requested
+            # with the client credentials instead.
+            if con.token_backend.token or con.token_backend.get_token():
+                con.token_refresher.ensure_valid()
+            else:
+                con.request_token(None)
         if not self.client.is_authenticated:
             raise MSGraphAuthenticationError(
                 "The MS Graph client is not authenticated."
             )
 
     def _get_refresh_token(self):
-        """Returns the refresh token using the backend if that backend
-        is not the Vault.
+        """Returns the refresh token if the backend is not the Vault, where
+        it is kept already.
         """
-        try:
-            if isinstance(self.token_backend, FileSystemTokenBackend):
-                return self.token_backend.load_token().get("refresh_token")
-            else:
-                return None
-        except AttributeError:
+        backend = self.token_backend
+        if isinstance(backend, MemoryTokenBackend):
+            backend = backend.persistent_backend
+        if isinstance(backend, RobocorpVaultTokenBackend):
             return None
+        token = self.token_backend.token
+        return token.get("refresh_token") if token else None
 
     def _get_drive_instance(
         self, resource: Optional[str] = None, drive_id: Optional[str] = None
     ) -> drive.Drive:
         """Returns the specified drive if any or the default one if none."""
+        key = ("drive", resource, drive_id)
+        drive_instance = self._cache.get(key)
+        if drive_instance is not None:
+            return drive_instance
         storage = self.client.storage(resource=resource)
         if drive_id:
-            return storage.get_drive(drive_id)
+            drive_instance = storage.get_drive(drive_id)
         else:
-            return storage.get_default_drive()
+            drive_instance = storage.get_default_drive()
+        return self._cache.set(key, drive_instance)
 
     def _get_folder_instance(
         self,
@@ -188,10 +390,22 @@ class MSGraph:
                 return folder
             else:
                 raise TypeError("The folder argument is not of Folder type.")
-        elif folder in [None, "/", "\\", "root", "ROOT", ""]:
-            return drive_instance.get_root_folder()
+        key = (
+            "folder",
+            drive_instance.main_resource,
+            drive_instance.object_id,
+            "/" if folder in ROOT_FOLDER_ALIASES else "/" + folder.strip("/\\"),
+        )
+        folder_instance = self._cache.get(key)
+        if folder_instance is not None:
+            return folder_instance
+        if folder in ROOT_FOLDER_ALIASES:
+            folder_instance = drive_instance.get_root_folder()
         else:
-            return drive_instance.get_item_by_path(folder)
+            folder_instance = drive_instance.get_item_by_path(folder)
+        if isinstance(folder_instance, drive.Folder):
+            self._cache.set(key, folder_instance)
+        return folder_instance
 
     def _get_file_instance(
         self, target_file: Union[drive.File, str], drive_instance: drive.Drive
@@ -221,6 +435,9 @@ class MSGraph:
         file_instance: drive.File,
         to_path: Union[Path, str, None] = None,
         name: Optional[str] = None,
+        segment_threshold: Optional[int] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        resumable: bool = False,
     ) -> Path:
         """Downloads the file and return the destination path.
         The O365 library returns only a boolean, so it was necessary
@@ -244,17 +461,507 @@ class MSGraph:
         name = name or file_instance.name
         downloaded_file = to_path / name
 
+        if resumable:
+            self._download_file_resumable(file_instance, downloaded_file)
+            return downloaded_file
+
+        if segment_threshold is not None and file_instance.size >= int(
+            segment_threshold
+        ):
+            self._download_file_in_segments(file_instance, downloaded_file, max_workers)
+            return downloaded_file
+
         success = file_instance.download(to_path=to_path, name=name)
         if not success:
             raise MSGraphDownloadError("Downloading file failed.")
         return downloaded_file
 
+    def _get_download_data(self, file_instance: drive.File) -> dict:
+        """Returns the size, eTag, hashes and pre-authenticated download URL
+        of the file, which DriveItems don't keep.
+        """
+        url = self._endpoint_url(file_instance, "item", id=file_instance.object_id)
+        params = {"$select": "id,size,eTag,file,@microsoft.graph.downloadUrl"}
+        return self.client.con.get(url, params=params).json()
+
+    def _resume_offset(self, part_file: Path, state_file: Path, etag: str) -> int:
+        """Returns the number of bytes already downloaded to the partial
+        file, or 0 if there is none or the remote file changed since.
+        """
+        if not part_file.exists() or not state_file.exists():
+            return 0
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+        if state.get("etag") != etag:
+            self.logger.info("%s changed, restarting download.", part_file.stem)
+            return 0
+        return min(state.get("offset", 0), part_file.stat().st_size)
+
+    @staticmethod
+    def _save_download_state(state_file: Path, etag: str, offset: int) -> None:
+        temp_file = state_file.with_name(state_file.name + ".tmp")
+        temp_file.write_text(
+            json.dumps({"etag": etag, "offset": offset}), encoding="utf-8"
+        )
+        temp_file.replace(state_file)
+
+    def _download_file_resumable(
+        self, file_instance: drive.File, destination: Path
+    ) -> None:
+        """Downloads the file into a partial file next to the destination,
+        checkpointing the eTag and the bytes written so an interrupted
+        download resumes with a range request. The partial file is renamed
+        to the destination once complete.
+        """
+        data = self._get_download_data(file_instance)
+        part_file = destination.with_name(destination.name + DOWNLOAD_PART_SUFFIX)
+        state_file = destination.with_name(destination.name + DOWNLOAD_STATE_SUFFIX)
+        offset = self._resume_offset(part_file, state_file, data.get("eTag"))
+        # A partial file completed before the rename only needs the rename,
+        # a range starting at the file size would be refused.
+        if not offset or offset < data["size"]:
+            self._download_remaining(data, part_file, state_file, offset)
+            offset = part_file.stat().st_size
+        if offset != data["size"]:
+            raise MSGraphDownloadError(
+                "Download of {} stopped at {} of {} bytes.".format(
+                    destination.name, offset, data["size"]
+                )
+            )
+        part_file.replace(destination)
+        state_file.unlink(missing_ok=True)
+
+    def _download_remaining(
+        self, data: dict, part_file: Path, state_file: Path, offset: int
+    ) -> None:
+        """Downloads the file from the offset into the partial file, from
+        the start if the server doesn't support range requests.
+        """
+        headers = {"Range": "bytes={}-".format(offset)} if offset else {}
+        response = self.client.con.naive_request(
+            data["@microsoft.graph.downloadUrl"], "GET", headers=headers, stream=True
+        )
+        with response as stream:
+            if stream.status_code != 206:
+                offset = 0
+            with open(part_file, "r+b" if offset else "wb") as file:
+                file.seek(offset)
+                file.truncate()
+                for chunk in stream.iter_content(chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+                    file.write(chunk)
+                    file.flush()
+                    offset += len(chunk)
+                    self._save_download_state(state_file, data.get("eTag"), offset)
+
+    def _download_segment(
+        self, download_url: str, destination: Path, start: int, end: int
+    ) -> None:
+        """Downloads the byte range into the same position of the file."""
+        response = self.client.con.naive_request(
+            download_url,
+            "GET",
+            headers={"Range": "bytes={}-{}".format(start, end)},
+            stream=True,
+        )
+        with response as stream, open(destination, "r+b") as file:
+            if stream.status_code != 206:
+                raise MSGraphDownloadError("Range requests are not supported.")
+            file.seek(start)
+            for chunk in stream.iter_content(chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+                file.write(chunk)
+            if file.tell() != end + 1:
+                raise MSGraphDownloadError(
+                    "Segment {}-{} of {} is incomplete.".format(
+                        start, end, destination.name
+                    )
+                )
+
+    def _download_file_in_segments(
+        self,
+        file_instance: drive.File,
+        destination: Path,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """Downloads the file with concurrent range requests, each segment
+        being written straight into a preallocated part file, which replaces
+        the destination once every segment is written and the hash reported
+        by Graph matches.
+        """
+        data = self._get_download_data(file_instance)
+        download_url = data["@microsoft.graph.downloadUrl"]
+        size = data["size"]
+        part_file = destination.with_name(
+            destination.name + ".segments" + DOWNLOAD_PART_SUFFIX
+        )
+        with open(part_file, "wb") as file:
+            file.truncate(size)
+        segments = [
+            (start, min(start + DEFAULT_SEGMENT_SIZE, size) - 1)
+            for start in range(0, size, DEFAULT_SEGMENT_SIZE)
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=int(max_workers)) as executor:
+                list(
+                    executor.map(
+                        lambda segment: self._download_segment(
+                            download_url, part_file, *segment
+                        ),
+                        segments,
+                    )
+                )
+            remote_hash = FolderMirrorIndex.remote_hash(data)
+            if remote_hash and not FolderMirrorIndex.matches_hash(
+                part_file, remote_hash
+            ):
+                raise MSGraphDownloadError(
+                    "The {} of {} does not match.".format(
+                        remote_hash[0], destination.name
+                    )
+                )
+        except BaseException:
+            part_file.unlink(missing_ok=True)
+            raise
+        part_file.replace(destination)
+
+    def _open_file_stream(self, file_instance: drive.File) -> Response:
+        """Requests the content of the file without reading the body."""
+        if not isinstance(file_instance, drive.File):
+            raise MSGraphDownloadError("Drive item is not a file.")
+        url = self._endpoint_url(file_instance, "download", id=file_instance.object_id)
+        return self.client.con.get(url, stream=True)
+
+    @staticmethod
+    def _iter_response_content(response: Response, chunk_size: int) -> Iterator[bytes]:
+        with response as stream:
+            yield from stream.iter_content(chunk_size=chunk_size)
+
+    def _download_with_result(
+        self,
+        source: str,
+        get_file: Callable[[], drive.File],
+        to_path: Path,
+    ) -> dict:
+        """Downloads the file returned by ``get_file`` and reports the outcome
+        instead of raising, so one failure doesn't stop a bulk download.
+        """
+        result = {
+            "source": source,
+            "path": None,
+            "size": 0,
+            "elapsed": 0.0,
+            "error": None,
+        }
+        start = time.monotonic()
+        try:
+            downloaded_file = self._download_file(get_file(), to_path)
+            result["path"] = downloaded_file
+            result["size"] = downloaded_file.stat().st_size
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.warning("Downloading %s failed: %s", source, err)
+            result["error"] = str(err)
+        result["elapsed"] = round(time.monotonic() - start, 3)
+        return result
+
+    def _download_files(
+        self,
+        drive_instance: drive.Drive,
+        target_files: list[Union[drive.File, str]],
+        to_path: Union[Path, str, None] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> list[dict]:
+        """Downloads the files concurrently and returns one result per file,
+        in the same order. Files named like an earlier one would be written
+        to the same local file, so they fail instead of being downloaded.
+        """
+        to_path = Path(to_path) if to_path is not None else Path()
+        if not to_path.exists():
+            raise FileNotFoundError("{} does not exist".format(to_path))
+        names: set[str] = set()
+        duplicates = set()
+        for index, target_file in enumerate(target_files):
+            if isinstance(target_file, str):
+                name = PurePosixPath(target_file).name
+            else:
+                name = getattr(target_file, "name", None) or ""
+            # Local file systems may not tell names apart by case.
+            name = name.casefold()
+            if name and name in names:
+                duplicates.add(index)
+            names.add(name)
+
+        def get_duplicate(name: str) -> drive.File:
+            raise MSGraphDownloadError(
+                "Another file is already downloaded to {}.".format(to_path / name)
+            )
+
+        def download(index: int, target_file: Union[drive.File, str]) -> dict:
+            source = target_file if isinstance(target_file, str) else target_file.name
+            if index in duplicates:
+                return self._download_with_result(
+                    source, lambda: get_duplicate(PurePosixPath(source).name), to_path
+                )
+            return self._download_with_result(
+                source,
+                lambda: self._get_file_instance(target_file, drive_instance),
+                to_path,
+            )
+
+        with ThreadPoolExecutor(max_workers=int(max_workers)) as executor:
+            return list(executor.map(download, range(len(target_files)), target_files))
+
+    def _iter_graph_responses(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        prefetch: bool = True,
+        headers: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        """Yields every page of a Graph collection, following
+        ``@odata.nextLink`` until the last page. With ``prefetch`` the next
+        page is requested while the current one is being consumed. The
+        ``headers`` are sent with every page request.
+        """
+        request_kwargs = {"headers": headers} if headers else {}
+
+        def fetch(page_url: str, page_params: Optional[dict] = None) -> dict:
+            response = self.client.con.get(
+                page_url, params=page_params, **request_kwargs
+            )
+            return response.json() if response else {}
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            data = fetch(url, params)
+            while True:
+                next_link = data.get(NEXT_LINK_KEYWORD)
+                pending = (
+                    executor.submit(fetch, next_link)
+                    if next_link and prefetch
+                    else None
+                )
+                yield data
+                if not next_link:
+                    return
+                data = pending.result() if pending else fetch(next_link)
+
+    def _iter_graph_pages(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        prefetch: bool = True,
+        headers: Optional[dict] = None,
+    ) -> Iterator[list[dict]]:
+        """Yields the ``value`` of every page of a Graph collection."""
+        for data in self._iter_graph_responses(url, params, prefetch, headers):
+            yield data.get("value", [])
+
+    @staticmethod
+    def _endpoint_url(api_component: ApiComponent, endpoint: str, **kwargs) -> str:
+        """Returns the URL of a Graph endpoint known by the O365 object."""
+        # pylint: disable=protected-access
+        return api_component.build_url(
+            api_component._endpoints.get(endpoint).format(**kwargs)
+        )
+
+    @staticmethod
+    def _drive_item_from_data(
+        parent: Union[drive.Drive, drive.Folder], data: dict
+    ) -> drive.DriveItem:
+        # pylint: disable=protected-access
+        return parent._classifier(data)(parent=parent, **{parent._cloud_data_key: data})
+
+    def _folder_children_url(self, folder_instance: drive.Folder) -> str:
+        return self._endpoint_url(
+            folder_instance, "list_items", id=folder_instance.object_id
+        )
+
+    def _iter_drive_items(
+        self,
+        parent: Union[drive.Drive, drive.Folder],
+        url: str,
+        include_folders: bool = False,
+        page_size: Optional[int] = None,
+        fields: Union[list[str], str, None] = None,
+    ) -> Iterator[Union[drive.DriveItem, dict]]:
+        """Yields the drive items of a listing page by page. With ``fields``
+        only those properties are requested through ``$select`` and every
+        item is yielded as a dictionary instead of a DriveItem.
+        """
+        params = {"$top": page_size or parent.protocol.max_top_value}
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(",")]
+        if fields:
+            # Folders can only be told apart by their folder facet.
+            selected = fields if include_folders else fields + ["folder"]
+            params["$select"] = ",".join(dict.fromkeys(selected))
+        for page in self._iter_graph_pages(url, params):
+            for data in page:
+                if not include_folders and "folder" in data:
+                    continue
+                if fields:
+                    yield {field: data.get(field) for field in fields}
+                else:
+                    yield self._drive_item_from_data(parent, data)
+
+    def _iter_folder_items(
+        self,
+        folder_instance: drive.Folder,
+        include_folders: bool = False,
+        page_size: Optional[int] = None,
+        fields: Union[list[str], str, None] = None,
+    ) -> Iterator[Union[drive.DriveItem, dict]]:
+        """Yields the children of the folder page by page."""
+        return self._iter_drive_items(
+            folder_instance,
+            self._folder_children_url(folder_instance),
+            include_folders,
+            page_size,
+            fields,
+        )
+
+    def _iter_search_results(
+        self,
+        search_string: str,
+        parent: Union[drive.Drive, drive.Folder],
+        include_folders: bool = False,
+        fields: Union[list[str], str, None] = None,
+    ) -> Iterator[Union[drive.DriveItem, dict]]:
+        """Yields the items found by searching the drive or folder."""
+        if isinstance(parent, drive.Drive) and parent.object_id is None:
+            endpoint = "search_default"
+        else:
+            endpoint = "search"
+        url = self._endpoint_url(
+            parent, endpoint, id=parent.object_id, search_text=search_string
+        )
+        return self._iter_drive_items(parent, url, include_folders, fields=fields)
+
+    def _list_folder_items(
+        self, folder_instance: drive.Folder
+    ) -> list[tuple[drive.DriveItem, dict]]:
+        """Lists the children of the folder along with their Graph data,
+        which keeps properties DriveItems leave out, such as file hashes.
+        """
+        params = {"$top": folder_instance.protocol.max_top_value}
+        pages = self._iter_graph_pages(
+            self._folder_children_url(folder_instance), params
+        )
+        return [
+            (self._drive_item_from_data(folder_instance, data), data)
+            for page in pages
+            for data in page
+        ]
+
+    def _mirror_file_with_result(
+        self,
+        source: str,
+        file_instance: drive.File,
+        data: dict,
+        local_folder: Path,
+        mirror_index: FolderMirrorIndex,
+    ) -> dict:
+        """Downloads the file only if the local copy is outdated and records
+        it in the mirror index.
+        """
+        if mirror_index.is_current(source, data):
+            local_path = local_folder / file_instance.name
+            result = {
+                "source": source,
+                "path": local_path,
+                "size": local_path.stat().st_size,
+                "elapsed": 0.0,
+                "error": None,
+                "action": "skipped",
+            }
+        else:
+            result = self._download_with_result(
+                source, lambda: file_instance, local_folder
+            )
+            result["action"] = "downloaded"
+        if result["error"] is None:
+            mirror_index.add_file(source, data)
+        return result
+
+    def _submit_folder_file(
+        self,
+        executor: ThreadPoolExecutor,
+        source: str,
+        file_instance: drive.File,
+        data: dict,
+        local_folder: Path,
+        mirror_index: Optional[FolderMirrorIndex] = None,
+    ) -> Future:
+        if mirror_index is None:
+            return executor.submit(
+                self._download_with_result,
+                source,
+                lambda: file_instance,
+                local_folder,
+            )
+        return executor.submit(
+            self._mirror_file_with_result,
+            source,
+            file_instance,
+            data,
+            local_folder,
+            mirror_index,
+        )
+
+    def _download_folder_tree(
+        self,
+        folder_instance: drive.Folder,
+        destination: Path,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        mirror_index: Optional[FolderMirrorIndex] = None,
+    ) -> list[dict]:
+        """Walks the folder tree and downloads every file, listing subfolders
+        and downloading files concurrently through the same worker pool.
+        The local directory structure is created as the folders are listed.
+        With a ``mirror_index``, files already up to date are skipped.
+        Returns the download results of every file.
+        """
+        destination.mkdir(parents=True, exist_ok=True)
+        downloads = []
+        with ThreadPoolExecutor(max_workers=int(max_workers)) as executor:
+            listings = {
+                executor.submit(self._list_folder_items, folder_instance): destination
+            }
+            while listings:
+                done, _ = wait(listings, return_when=FIRST_COMPLETED)
+                for future in done:
+                    local_folder = listings.pop(future)
+                    for item, data in future.result():
+                        local_path = local_folder / item.name
+                        source = local_path.relative_to(destination).as_posix()
+                        if not item.is_folder:
+                            downloads.append(
+                                self._submit_folder_file(
+                                    executor,
+                                    source,
+                                    item,
+                                    data,
+                                    local_folder,
+                                    mirror_index,
+                                )
+                            )
+                            continue
+                        if mirror_index is not None:
+                            mirror_index.add_folder(source)
+                        local_path.mkdir(exist_ok=True)
+                        if item.child_count:
+                            listings[
+                                executor.submit(self._list_folder_items, item)
+                            ] = local_path
+        return [future.result() for future in downloads]
+
     def _download_folder(
-        self, folder_instance: drive.Folder, to_folder: Union[Path, str, None] = None
-    ) -> Path:
-        """Downloads the content of the folder recursively.
-        The O365 library returns only a boolean, so it was necessary to define
-        the destination path the same way the O365 library does it.
+        self,
+        folder_instance: drive.Folder,
+        to_folder: Union[Path, str, None] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        mirror: bool = False,
+        delete_orphans: bool = False,
+    ) -> tuple[Path, list[dict]]:
+        """Downloads the content of the folder recursively and returns the
+        local folder along with the download results of every file.
         """
         if not isinstance(folder_instance, drive.Folder):
             raise MSGraphDownloadError("Drive item is not a folder.")
@@ -262,32 +969,565 @@ class MSGraph:
             downloaded_folder = Path() / folder_instance.name
         else:
             downloaded_folder = Path() / to_folder
-        # Method download_contents has no return value.
-        folder_instance.download_contents(to_folder=to_folder)
-        return downloaded_folder
+        mirror_index = FolderMirrorIndex(downloaded_folder) if mirror else None
+        manifest = self._download_folder_tree(
+            folder_instance, downloaded_folder, max_workers, mirror_index
+        )
+        if mirror_index is not None:
+            if delete_orphans:
+                manifest.extend(self._delete_orphans(mirror_index))
+            mirror_index.save()
+        return downloaded_folder, manifest
+
+    def _delete_orphans(self, mirror_index: FolderMirrorIndex) -> list[dict]:
+        """Deletes the local files and folders missing from the remote folder
+        and returns their results.
+        """
+        results = []
+        for path in mirror_index.orphans():
+            result = {
+                "source": path.relative_to(mirror_index.folder).as_posix(),
+                "path": path,
+                "size": 0 if path.is_dir() else path.stat().st_size,
+                "elapsed": 0.0,
+                "error": None,
+                "action": "deleted",
+            }
+            try:
+                self._remove_local_path(path)
+            except OSError as err:
+                self.logger.warning("Deleting %s failed: %s", path, err)
+                result["error"] = str(err)
+            results.append(result)
+        return results
+
+    def _create_upload_session(
+        self, folder: drive.Folder, file_path: Path, state_file: Path
+    ) -> dict:
+        """Creates a Graph upload session for the file and persists it."""
+        url = folder.build_url(
+            "/items/{}:/{}:/createUploadSession".format(
+                folder.object_id, quote(file_path.name)
+            )
+        )
+        response = self.client.con.post(
+            url, data={"item": {"@microsoft.graph.conflictBehavior": "replace"}}
+        )
+        data = response.json()
+        stat = file_path.stat()
+        state = {
+            "upload_url": data["uploadUrl"],
+            "expiration": data.get("expirationDateTime"),
+            "target": folder.object_id,
+            "size": stat.st_size,
+            "modified": stat.st_mtime,
+            "offset": 0,
+        }
+        state_file.write_text(json.dumps(state), encoding="utf-8")
+        return state
+
+    def _resume_upload_session(
+        self, folder: drive.Folder, file_path: Path, state_file: Path
+    ) -> Optional[dict]:
+        """Returns the persisted upload session if it still belongs to the
+        same local file and target folder, updated with the offset the
+        server expects next. Returns ``None`` if it can't be resumed.
+        """
+        if not state_file.exists():
+            return None
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+        stat = file_path.stat()
+        if (state.get("target"), state.get("size"), state.get("modified")) != (
+            folder.object_id,
+            stat.st_size,
+            stat.st_mtime,
+        ):
+            self.logger.info("Discarding upload session of a different file.")
+            return None
+        try:
+            # Upload URLs are pre-authenticated and must not get the token.
+            response = self.client.con.naive_request(state["upload_url"], "GET")
+        except HTTPError as err:
+            self.logger.info("Upload session can't be resumed: %s", err)
+            return None
+        state["offset"] = self._next_expected_offset(response.json(), 0)
+        self.logger.info("Resuming upload of %s at byte %s", file_path, state["offset"])
+        return state
+
+    @staticmethod
+    def _next_expected_offset(data: dict, default: int) -> int:
+        ranges = data.get("nextExpectedRanges")
+        return int(ranges[0].split("-")[0]) if ranges else default
+
+    def _upload_file_in_session(
+        self,
+        folder: drive.Folder,
+        file_path: Union[Path, str],
+        chunk_size: int = drive.DEFAULT_UPLOAD_CHUNK_SIZE,
+        state_file: Union[Path, str, None] = None,
+    ) -> drive.DriveItem:
+        """Uploads the file in chunks through a Graph upload session.
+
+        The session URL and the uploaded byte offset are persisted to the
+        state file after every chunk, so an interrupted upload is resumed
+        by calling this again with the same file and folder.
+        """
+        chunk_size = int(chunk_size)
+        if chunk_size <= 0 or chunk_size % drive.CHUNK_SIZE_BASE:
+            raise ValueError(
+                "Chunk size must be a multiple of {} bytes (320 KiB).".format(
+                    drive.CHUNK_SIZE_BASE
+                )
+            )
+        file_path = Path(file_path)
+        if not file_path.is_file():
+            raise FileNotFoundError("{} does not exist".format(file_path))
+        if state_file is None:
+            state_file = file_path.with_name(file_path.name + UPLOAD_STATE_SUFFIX)
+        state_file = Path(state_file)
+
+        state = self._resume_upload_session(folder, file_path, state_file)
+        if state is None:
+            state = self._create_upload_session(folder, file_path, state_file)
+
+        with file_path.open("rb") as stream:
+            while state["offset"] < state["size"]:
+                stream.seek(state["offset"])
+                data = stream.read(chunk_size)
+                headers = {
+                    "Content-type": "application/octet-stream",
+                    "Content-Length": str(len(data)),
+                    "Content-Range": "bytes {}-{}/{}".format(
+                        state["offset"], state["offset"] + len(data) - 1, state["size"]
+                    ),
+                }
+                response = self.client.con.naive_request(
+                    state["upload_url"], "PUT", data=data, headers=headers
+                )
+                if response.status_code != 202:
+                    state_file.unlink(missing_ok=True)
+                    return self._drive_item_from_data(folder, response.json())
+                state["offset"] = self._next_expected_offset(
+                    response.json(), state["offset"] + len(data)
+                )
+                state_file.write_text(json.dumps(state), encoding="utf-8")
+        raise MSGraphUploadError(
+            "Upload session of {} ended without a completed item.".format(file_path)
+        )
+
+    def _get_or_create_child_folder(
+        self, parent: drive.Folder, name: str
+    ) -> drive.Folder:
+        """Returns the child folder with the given name, creating it if
+        it doesn't exist yet.
+        """
+        url = parent.build_url("/items/{}:/{}".format(parent.object_id, quote(name)))
+        try:
+            data = self.client.con.get(url).json()
+        except HTTPError as err:
+            if err.response is None or err.response.status_code != 404:
+                raise
+            return parent.create_child_folder(name)
+        child = self._drive_item_from_data(parent, data)
+        if not isinstance(child, drive.Folder):
+            raise TypeError("'{}' exists and is not a folder.".format(name))
+        return child
+
+    def _resolve_upload_folders(
+        self, base_folder: drive.Folder, relative_folders: set[PurePosixPath]
+    ) -> Dict[PurePosixPath, drive.Folder]:
+        """Resolves every remote folder once, parents first, creating the
+        missing ones.
+        """
+        folders = {PurePosixPath("."): base_folder}
+        for relative_folder in sorted(relative_folders, key=lambda p: len(p.parts)):
+            for depth in range(1, len(relative_folder.parts) + 1):
+                key = PurePosixPath(*relative_folder.parts[:depth])
+                if key not in folders:
+                    folders[key] = self._get_or_create_child_folder(
+                        folders[key.parent], key.name
+                    )
+        return folders
+
+    @staticmethod
+    def _collect_upload_files(
+        source: Union[Path, str]
+    ) -> list[tuple[Path, PurePosixPath]]:
+        """Returns the local files with the remote folder they go to, relative
+        to the target folder. Directories keep their structure, glob matches
+        are uploaded flat.
+        """
+        source_path = Path(source)
+        if source_path.is_dir():
+            return [
+                (path, PurePosixPath(path.parent.relative_to(source_path).as_posix()))
+                for path in sorted(source_path.rglob("*"))
+                if path.is_file()
+            ]
+        return [
+            (Path(path), PurePosixPath("."))
+            for path in sorted(glob.glob(str(source), recursive=True))
+            if Path(path).is_file()
+        ]
+
+    def _upload_with_result(
+        self, file_path: Path, folder: drive.Folder, target: str
+    ) -> dict:
+        """Uploads the file and reports the outcome instead of raising."""
+        result = {
+            "source": file_path,
+            "target": target,
+            "item": None,
+            "size": 0,
+            "elapsed": 0.0,
+            "error": None,
+        }
+        start = time.monotonic()
+        try:
+            result["item"] = folder.upload_file(item=file_path)
+            if result["item"] is None:
+                raise MSGraphUploadError("Uploading file failed.")
+            result["size"] = file_path.stat().st_size
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.warning("Uploading %s failed: %s", file_path, err)
+            result["error"] = str(err)
+        result["elapsed"] = round(time.monotonic() - start, 3)
+        return result
+
+    @staticmethod
+    def _load_sync_state(state_file: Path, **identity: Any) -> dict:
+        """Returns the saved delta state, or a new one if the state file is
+        missing or was saved for another ``identity``, like another folder.
+        """
+        new_state = {**identity, "items": {}}
+        if not state_file.exists():
+            return new_state
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+        if any(state.get(key) != value for key, value in identity.items()):
+            return new_state
+        return state
+
+    @staticmethod
+    def _save_sync_state(state_file: Path, state: dict) -> None:
+        temp_file = state_file.with_name(state_file.name + ".tmp")
+        temp_file.write_text(json.dumps(state), encoding="utf-8")
+        temp_file.replace(state_file)
+
+    def _fetch_delta(
+        self, url: str, state: dict, params: Optional[dict] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """Returns the changed items since the saved delta link, each item
+        only once with its latest state, and the new delta link. An expired
+        delta link restarts the state with a full enumeration of ``url``.
+        """
+        changes = {}
+        delta_link = None
+        pages = (
+            self._iter_graph_responses(state["delta_link"])
+            if state.get("delta_link")
+            else self._iter_graph_responses(url, params)
+        )
+        try:
+            for data in pages:
+                for item in data.get("value", []):
+                    changes[item["id"]] = item
+                delta_link = data.get("@odata.deltaLink", delta_link)
+        except HTTPError as err:
+            expired = err.response is not None and err.response.status_code == 410
+            if not expired or not state.get("delta_link"):
+                raise
+            self.logger.warning("Delta link expired, syncing all items again.")
+            state["delta_link"] = None
+            state["items"] = {}
+            return self._fetch_delta(url, state, params)
+        return list(changes.values()), delta_link
+
+    def _fetch_drive_delta(
+        self, folder_instance: drive.Folder, state: dict
+    ) -> tuple[list[dict], Optional[str]]:
+        return self._fetch_delta(
+            folder_instance.build_url(
+                "/items/{}/delta".format(folder_instance.object_id)
+            ),
+            state,
+        )
+
+    @staticmethod
+    def _record_drive_change(data: dict, paths: Dict[str, str]) -> dict:
+        """Updates the known item paths with the changed item and returns
+        the change record.
+        """
+        item_id = data["id"]
+        previous_path = paths.get(item_id)
+        if "deleted" in data:
+            change, path = "deleted", previous_path
+            paths.pop(item_id, None)
+        else:
+            parent_id = data.get("parentReference", {}).get("id")
+            path = str(PurePosixPath(paths.get(parent_id, ""), data["name"]))
+            change = "modified" if previous_path is not None else "added"
+            paths[item_id] = path
+        if previous_path and previous_path != path:
+            # Children of moved or deleted folders aren't reported by Graph.
+            prefix = previous_path + "/"
+            for child_id, child_path in list(paths.items()):
+                if not child_path.startswith(prefix):
+                    continue
+                if path is None:
+                    del paths[child_id]
+                else:
+                    paths[child_id] = path + "/" + child_path[len(prefix) :]
+        return {
+            "id": item_id,
+            "name": data.get("name"),
+            "path": path,
+            "previous_path": previous_path if previous_path != path else None,
+            "change": change,
+            "is_folder": "folder" in data,
+            "size": data.get("size", 0),
+            "last_modified": data.get("lastModifiedDateTime"),
+            "local_path": None,
+            "error": None,
+        }
+
+    @staticmethod
+    def _remove_local_path(path: Optional[Path]) -> None:
+        if path is None:
+            return
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+
+    def _mirror_drive_change(
+        self,
+        folder_instance: drive.Folder,
+        data: dict,
+        record: dict,
+        to_folder: Path,
+    ) -> None:
+        """Applies the change to the local copy of the synced folder."""
+        target = to_folder / record["path"] if record["path"] else None
+        previous = None
+        if record["previous_path"]:
+            previous = to_folder / record["previous_path"]
+        if record["change"] == "deleted":
+            self._remove_local_path(target)
+        elif record["is_folder"]:
+            if previous is not None and previous.exists() and not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                previous.rename(target)
+            else:
+                target.mkdir(parents=True, exist_ok=True)
+            record["local_path"] = target
+        else:
+            self._remove_local_path(previous)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            file_instance = self._drive_item_from_data(folder_instance, data)
+            record["local_path"] = self._download_file(file_instance, target.parent)
 
     def _get_sharepoint_drive(
         self, site: sharepoint.Site, drive_id: str = None
     ) -> drive.Drive:
         """Returns the specified SharePoint drive if any or the default one if none."""
+        key = ("drive", site.main_resource, drive_id)
+        sp_drive = self._cache.get(key)
+        if sp_drive is not None:
+            return sp_drive
         if drive_id:
-            return site.get_document_library(drive_id)
+            sp_drive = site.get_document_library(drive_id)
         else:
-            return site.get_default_document_library()
+            sp_drive = site.get_default_document_library()
+        return self._cache.set(key, sp_drive)
 
-    def _sharepoint_items_into_dict_list(
-        self, items_instance: list[sharepoint.SharepointListItem]
+    def _iter_sharepoint_list_items(
+        self,
+        sp_list: sharepoint.SharepointList,
+        params: dict,
+        top: Optional[int] = None,
+        headers: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        """Yields the Graph data of the list items, page by page, stopping
+        after ``top`` items.
+        """
+        url = self._endpoint_url(sp_list, "get_items")
+        items = (
+            data
+            for page in self._iter_graph_pages(url, params, headers=headers)
+            for data in page
+        )
+        return itertools.islice(items, top)
+
+    @staticmethod
+    def _list_fields_expand(select_fields: Union[list[str], str, None]) -> str:
+        """Returns the ``$expand`` value requesting the given item fields,
+        or all of them.
+        """
+        if isinstance(select_fields, str):
+            select_fields = [field.strip() for field in select_fields.split(",")]
+        if select_fields:
+            return f"fields($select={','.join(select_fields)})"
+        return "fields"
+
+    @staticmethod
+    def _sharepoint_item_into_dict(data: dict) -> dict:
+        return {"object_id": data.get("id"), **data.get("fields", {})}
+
+    @staticmethod
+    def _writable_list_fields(row: dict, id_column: str) -> dict:
+        """Returns the fields of a list item row that can be updated,
+        leaving out the ID and the read-only system fields returned by
+        Graph with the item.
+        """
+        return {
+            key: value
+            for key, value in row.items()
+            if key != id_column
+            and key not in READ_ONLY_LIST_FIELDS
+            and not key.startswith(("@odata", "_", "LinkTitle"))
+            and not key.endswith("LookupId")
+        }
+
+    @staticmethod
+    def _sharepoint_items_into_columns(items: Iterable[dict]) -> dict[str, list]:
+        """Collects the fields of the list items into one list per column,
+        filling the fields missing from an item with ``None``. This avoids
+        creating a dictionary per item, which dominates the memory used by
+        large lists.
+        """
+        columns: dict[str, list] = {"object_id": []}
+        object_ids = columns["object_id"]
+        for data in items:
+            row = len(object_ids)
+            object_ids.append(data.get("id"))
+            for name, value in data.get("fields", {}).items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = []
+                if len(column) < row:
+                    column.extend([None] * (row - len(column)))
+                column.append(value)
+        for column in columns.values():
+            column.extend([None] * (len(object_ids) - len(column)))
+        return columns
+
+    @staticmethod
+    def _columns_into_table(columns: dict[str, list], as_columns: bool) -> Any:
+        """Returns the columns as a table, or as a list of dictionaries if
+        ``RPA.Tables`` is not available, unless ``as_columns`` is set.
+        """
+        if as_columns:
+            return columns
+        if Table:
+            return Table(columns)
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    def _iter_table_chunks(
+        self, items: Iterator[dict], chunk_size: int, as_columns: bool = False
+    ) -> Iterator[DataTable]:
+        """Yields the list items grouped in tables of at most ``chunk_size``
+        rows.
+        """
+        items = iter(items)
+        while True:
+            columns = self._sharepoint_items_into_columns(
+                itertools.islice(items, int(chunk_size))
+            )
+            if not columns["object_id"]:
+                return
+            yield self._columns_into_table(columns, as_columns)
+
+    def _new_batch(self, max_size: int = GRAPH_BATCH_LIMIT) -> GraphBatch:
+        """Returns an empty batch bound to the client connection."""
+        return GraphBatch(self.client.con, self.client.protocol.service_url, max_size)
+
+    def _send_batch_with_retries(self, requests: list[dict]) -> list[dict]:
+        """Sends up to 20 requests in one batch, resending the ones throttled
+        inside the batch, and returns the responses in the same order.
+        """
+        batch = self._new_batch()
+        request_ids = [batch.add(**request) for request in requests]
+        responses = batch.execute()
+        return [responses[request_id] for request_id in request_ids]
+
+    def _send_batched(
+        self, requests: list[dict], max_workers: int = DEFAULT_MAX_WORKERS
     ) -> list[dict]:
-        """Turns a list of SharePointListItem into a list of dictionaries.
-        This improves the Robot Developer experience, since the inspection
-        of attributes isn't easy in Robot Framework.
+        """Splits the requests in batches sent concurrently and returns the
+        responses in the same order.
+        """
+        chunks = [
+            requests[start : start + GRAPH_BATCH_LIMIT]
+            for start in range(0, len(requests), GRAPH_BATCH_LIMIT)
+        ]
+        with ThreadPoolExecutor(max_workers=int(max_workers)) as executor:
+            return [
+                response
+                for responses in executor.map(self._send_batch_with_retries, chunks)
+                for response in responses
+            ]
+
+    @staticmethod
+    def _table_to_dict_list(items: DataTable) -> list[dict]:
+        if Table and isinstance(items, Table):
+            return list(items.iter_dicts(with_index=False))
+        return [dict(item) for item in items]
+
+    @staticmethod
+    def _list_item_result(index: int, item_id: Optional[str], response: dict) -> dict:
+        body = response.get("body") or {}
+        error = None
+        if response["status"] >= 400:
+            error = body.get("error", {}).get("message") or "Request failed."
+        return {
+            "index": index,
+            "object_id": item_id or body.get("id"),
+            "status": response["status"],
+            "error": error,
+        }
+
+    def _configure_app_client(
+        self,
+        credentials: tuple[str, str],
+        tenant_id: Optional[str],
+        scopes: Optional[list[str]],
+    ) -> None:
+        """Configures the client to authenticate as the app with the client
+        credentials flow. Tokens are cached in memory per app, tenant and
+        scopes, so every library instance in the process reuses them.
         """
-        items_list = []
-        for item in items_instance:
-            item_dict = {"object_id": item.object_id}
-            item_dict.update(item.fields)
-            items_list.append(item_dict)
-        return items_list
+        if not tenant_id:
+            raise ValueError("Argument tenant_id is required for app-only access.")
+        scopes = list(scopes or [DEFAULT_PROTOCOL.prefix_scope(".default")])
+        if not self._token_backend_given:
+            self.token_backend = MemoryTokenBackend(
+                "app:{}:{}:{}".format(
+                    tenant_id, credentials[0], " ".join(sorted(scopes))
+                )
+            )
+        self.client = Account(
+            credentials,
+            token_backend=self.token_backend,
+            auth_flow_type="credentials",
+            tenant_id=tenant_id,
+        )
+        self.client.con = MSGraphConnection(
+            credentials,
+            token_backend=self.token_backend,
+            auth_flow_type="credentials",
+            tenant_id=tenant_id,
+            scopes=scopes,
+            pool_size=self.pool_size,
+            keep_alive=self.keep_alive,
+            token_refresh_margin=self.token_refresh_margin,
+        )
+        token = self.token_backend.get_token()
+        if token and not token.is_expired:
+            return
+        if not self.client.con.request_token(None):
+            raise MSGraphAuthenticationError(
+                f"App-only authentication failed for tenant '{tenant_id}'."
+            )
 
     @keyword
     def configure_msgraph_client(
@@ -296,15 +1536,70 @@ class MSGraph:
         client_secret: str,
         refresh_token: Optional[str] = None,
         redirect_uri: str = DEFAULT_REDIRECT_URI,
+        tenant_id: Optional[str] = None,
+        app_only: bool = False,
+        scopes: Optional[list[str]] = None,
     ) -> Union[str, None]:
+        # pylint: disable=anomalous-backslash-in-string
         """Configures the MS Graph client. If a refresh token is
         known, it can be provided to obtain a current user token
         to authenticate with. A new refresh token is returned
         if one is provided.
-        """
+
+        With ``app_only``, the client authenticates as the app itself with
+        the client credentials flow and is ready to use right away, without
+        \`Authorize And Get Token\` or refresh tokens. The app tokens are
+        cached in memory per tenant and scopes, and shared by the library
+        instances of the process.
+
+        :param client_id: Application client id.
+        :param client_secret: Application client secret.
+        :param refresh_token: Refresh token of the user, if known.
+        :param redirect_uri: Redirect URI of the app.
+        :param tenant_id: Directory (tenant) ID of the app, required with
+         ``app_only``.
+        :param app_only: Boolean indicating if the client authenticates as
+         the app instead of a user.
+        :param scopes: Scopes requested in app-only mode, defaults to the
+         ``.default`` scope of Graph, which grants every application
+         permission of the app.
+        :return: The new refresh token if one was provided.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Configure app-only client
+                Configure MSGraph Client    ${CLIENT_ID}    ${CLIENT_SECRET}
+                ...    tenant_id=${TENANT_ID}    app_only=${TRUE}
+                ${files}=    List Files In Onedrive Folder
+                ...    /Reports    resource=users/${USER_ID}
+        """  # noqa: W605
         credentials = (client_id, client_secret)
-        self.client = Account(credentials, token_backend=self.token_backend)
+        if getattr(self, "client", None) is not None:
+            self.client.con.token_refresher.stop()
         self.redirect_uri = redirect_uri
+        # Cached objects are bound to the previous client connection.
+        self._cache.clear()
+        if app_only:
+            self._configure_app_client(credentials, tenant_id, scopes)
+            self.client.con.scheduler.configure(
+                self.requests_per_second, self.max_retries
+            )
+            return None
+        self.token_backend = self._user_token_backend
+        connection_kwargs = {"tenant_id": tenant_id} if tenant_id else {}
+        self.client = Account(
+            credentials, token_backend=self.token_backend, **connection_kwargs
+        )
+        self.client.con = MSGraphConnection(
+            credentials,
+            token_backend=self.token_backend,
+            pool_size=self.pool_size,
+            keep_alive=self.keep_alive,
+            token_refresh_margin=self.token_refresh_margin,
+            **connection_kwargs,
+        )
+        self.client.con.scheduler.configure(self.requests_per_second, self.max_retries)
         if refresh_token:
             return self.refresh_oauth_token(refresh_token)
         return None
@@ -410,17 +1705,114 @@ class MSGraph:
         refresh token is returned. If no token is provided, this keyword
         assumes the Robocorp Vault is being used as a backend and attempts
         to refresh it based on that backend.
+
+        The access token is also refreshed automatically in the background
+        before it expires, see the ``token_refresh_margin`` library argument.
         """
         self._require_client()
         if refresh_token:
             self.token_backend.token = Token(refresh_token=refresh_token)
             self.token_backend.save_token()
-        if self.client.connection.refresh_token():
+        if self.client.connection.token_refresher.refresh():
             self.logger.info("Token successfully refreshed.")
             return self._get_refresh_token()
         else:
             raise MSGraphAuthenticationError("Access token could not be refreshed.")
 
+    @keyword
+    def clear_msgraph_cache(self) -> None:
+        """Clears the drives and folders cached by the library.
+
+        Drives and folders looked up by path are reused for the number of
+        seconds set with the ``cache_ttl`` library argument. Folders are
+        dropped from the cache when files are uploaded through the library,
+        but changes done elsewhere, such as a folder renamed in the browser,
+        are only seen after the cache expires or is cleared.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Refresh folders
+                Clear MSGraph Cache
+        """
+        self._cache.clear()
+
+    @keyword
+    def get_graph_request_statistics(self) -> dict:
+        """Returns the number of requests sent to Graph for the tenant of the
+        client, and how many of them were retried and throttled.
+
+        Throttled requests (HTTP 429, 503 and 504) are retried after the
+        time given in their ``Retry-After`` header, pausing every request to
+        the tenant meanwhile. Other failures are retried with a jittered
+        exponential backoff, up to ``max_retries`` times.
+
+        :return: Dictionary with the ``requests``, ``retried`` and
+         ``throttled`` counters.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Log throttling
+                ${stats}=    Get Graph Request Statistics
+                Log    ${stats}[throttled] requests were throttled
+        """
+        self._require_client()
+        return self.client.con.scheduler.statistics()
+
+    @keyword
+    def run_graph_batch(
+        self, requests: list[dict], batch_size: int = GRAPH_BATCH_LIMIT
+    ) -> list[dict]:
+        """Sends several Graph API requests through the JSON batching
+        endpoint, which takes up to 20 requests per round trip, and
+        returns the responses in the same order as the requests.
+
+        Each request is a dictionary with the keys ``method`` and ``url``
+        (relative to the API version, e.g. ``/me/drive/root``) and,
+        optionally, ``body``, ``headers``, ``id`` and ``dependsOn``. A request
+        listed in ``dependsOn`` is always sent before the requests that
+        depend on it, and if it fails the dependent requests are answered
+        with status ``424`` without being executed. Requests throttled by
+        Graph are resent after the wait it asks for, together with the
+        requests depending on them.
+
+        Each response is a dictionary with the keys ``id``, ``status``,
+        ``headers`` and ``body``.
+
+        :param requests: List of request dictionaries.
+        :param batch_size: Maximum number of requests sent per round trip.
+        :return: List of response dictionaries.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Run batch
+                ${me}=    Create Dictionary    method=GET    url=/me
+                ${drive}=    Create Dictionary    method=GET    url=/me/drive
+                ${requests}=    Create List    ${me}    ${drive}
+                ${responses}=    Run Graph Batch    ${requests}
+                FOR    ${response}    IN    @{responses}
+                    Log    ${response}[status]
+                    Log    ${response}[body]
+                END
+        """
+        self._require_authentication()
+        batch = self._new_batch(int(batch_size))
+        request_ids = [
+            batch.add(
+                request["method"],
+                request["url"],
+                body=request.get("body"),
+                headers=request.get("headers"),
+                depends_on=request.get("dependsOn"),
+                request_id=request.get("id"),
+            )
+            for request in requests
+        ]
+        responses = batch.execute()
+        return [responses[request_id] for request_id in request_ids]
+
     @keyword
     def get_me(self) -> directory.User:
         """Returns the MS Graph object representing the currently logged
@@ -475,20 +1867,14 @@ class MSGraph:
         """  # noqa: W605
         self._require_authentication()
 
-        # Get the session if not already defined, which is necessary because we
-        # need to modify the headers.
-        if self.client.con.session is None:
-            self.client.con.session = self.client.con.get_session(load_token=True)
-
         # It is necessary to pass a specific header to use $search, as the error
         # message instructs: "Request with $search query parameter only works through
         # MSGraph with a special request header: 'ConsistencyLevel: eventual'".
+        # The header is only added to this request, as the session is shared.
         active_directory = self.client.directory(resource)
         query = active_directory.new_query().search(f"{search_field}:{search_string}")
-        self.client.con.session.headers["ConsistencyLevel"] = "eventual"
-        users = active_directory.get_users(query=query)
-        del self.client.con.session.headers["ConsistencyLevel"]
-        return users
+        with self.client.con.request_headers({"ConsistencyLevel": "eventual"}):
+            return active_directory.get_users(query=query)
 
     @keyword
     def list_files_in_onedrive_folder(
@@ -497,17 +1883,36 @@ class MSGraph:
         include_folders: Optional[bool] = False,
         resource: Optional[str] = None,
         drive_id: Optional[str] = None,
-    ) -> list[drive.DriveItem]:
+        stream: bool = False,
+        page_size: Optional[int] = None,
+        fields: Union[list[str], str, None] = None,
+    ) -> Union[list, Iterator]:
         """Returns a list of files from the specified OneDrive folder.
 
         The files returned are DriveItem objects and they have additional
         properties that can be accessed with dot-notation.
 
+        With ``stream`` enabled, an iterator is returned instead of a list.
+        It yields the items as each page is received from Graph, while the
+        next page is already being requested, so large folders never have
+        all their items in memory at once.
+
+        With ``fields``, only the given Graph properties, such as ``id``,
+        ``name``, ``size`` or ``lastModifiedDateTime``, are requested and
+        each item is returned as a dictionary holding just those properties,
+        which is much lighter than a DriveItem for large folders.
+
         :param target_folder: Path of the folder in OneDrive.
         :param include_folders: Boolean indicating if should return folders as well.
         :param resource: Name of the resource if not using default.
         :param drive_id: Drive ID if not using default.
-        :return: List of DriveItems in the folder.
+        :param stream: Boolean indicating if should return an iterator
+         instead of a list.
+        :param page_size: Number of items requested per page when streaming,
+         defaults to 999, the maximum allowed by Graph.
+        :param fields: Graph properties to request, as a list or a comma
+         separated string.
+        :return: List or iterator of DriveItems in the folder.
 
         .. code-block: robotframework
 
@@ -527,10 +1932,20 @@ class MSGraph:
                     Log    ${file.size}
                     Log    ${file.web_url}
                 END
+
+            List file names and sizes
+                ${files}=    List Files In Onedrive Folder    /path/to/folder
+                ...    fields=name,size
+                FOR    ${file}    IN    @{files}
+                    Log    ${file}[name]: ${file}[size]
+                END
         """
         self._require_authentication()
         drive_instance = self._get_drive_instance(resource, drive_id)
         folder = self._get_folder_instance(drive_instance, target_folder)
+        if stream or fields:
+            items = self._iter_folder_items(folder, include_folders, page_size, fields)
+            return items if stream else list(items)
         items = folder.get_items()
         if include_folders:
             return items
@@ -544,6 +1959,9 @@ class MSGraph:
         name: Optional[str] = None,
         resource: Optional[str] = None,
         drive_id: Optional[str] = None,
+        segment_threshold: Optional[int] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        resumable: bool = False,
     ) -> Path:
         """Downloads a file from OneDrive.
 
@@ -555,6 +1973,13 @@ class MSGraph:
         :param name: New name for the downloaded file, with or without extension.
         :param resource: Name of the resource if not using default.
         :param drive_id: Drive ID if not using default.
+        :param segment_threshold: Size in bytes from which the file is
+         downloaded with parallel range requests and its hash verified,
+         disabled by default.
+        :param max_workers: Maximum number of simultaneous range requests.
+        :param resumable: Download into a ``.part`` file that is resumed by
+         the next call if interrupted, as long as the remote file has not
+         changed meanwhile.
         :return: Path to the downloaded file.
 
         .. code-block: robotframework
@@ -575,7 +2000,102 @@ class MSGraph:
         self._require_authentication()
         drive_instance = self._get_drive_instance(resource, drive_id)
         file_instance = self._get_file_instance(target_file, drive_instance)
-        return self._download_file(file_instance, to_path, name)
+        return self._download_file(
+            file_instance, to_path, name, segment_threshold, max_workers, resumable
+        )
+
+    @keyword
+    def stream_file_from_onedrive(
+        self,
+        target_file: Union[drive.File, str],
+        to_stream: Optional[BinaryIO] = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+        resource: Optional[str] = None,
+        drive_id: Optional[str] = None,
+    ) -> Union[Iterator[bytes], int]:
+        """Streams the content of a file from OneDrive without saving it
+        to disk.
+
+        If ``to_stream`` is given, the content is written into it chunk by
+        chunk and the number of bytes written is returned. Otherwise an
+        iterator yielding the chunks is returned, the connection is kept
+        open until the iterator is exhausted. The whole file is never held
+        in memory.
+
+        :param target_file: `DriveItem` or file path of the desired file.
+        :param to_stream: Binary file-like object the content is written to.
+        :param chunk_size: Size in bytes of the chunks read from the
+         connection, defaults to 1 MiB.
+        :param resource: Name of the resource if not using default.
+        :param drive_id: Drive ID if not using default.
+        :return: Iterator of chunks, or the number of bytes written.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Stream file into a buffer
+                ${buffer}=    Evaluate    io.BytesIO()    modules=io
+                ${size}=    Stream File From Onedrive
+                ...    /path/to/onedrive/file.csv
+                ...    to_stream=${buffer}
+        """
+        self._require_authentication()
+        drive_instance = self._get_drive_instance(resource, drive_id)
+        file_instance = self._get_file_instance(target_file, drive_instance)
+        chunks = self._iter_response_content(
+            self._open_file_stream(file_instance), int(chunk_size)
+        )
+        if to_stream is None:
+            return chunks
+        written = 0
+        for chunk in chunks:
+            to_stream.write(chunk)
+            written += len(chunk)
+        return written
+
+    @keyword
+    def download_files_from_onedrive(
+        self,
+        target_files: list[Union[drive.File, str]],
+        to_path: Union[Path, str, None] = None,
+        resource: Optional[str] = None,
+        drive_id: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> list[dict]:
+        """Downloads several files from OneDrive in parallel.
+
+        Each result is a dictionary with the keys ``source`` (the given path
+        or the item name), ``path`` (the local file, ``None`` on failure),
+        ``size`` (bytes written), ``elapsed`` (seconds) and ``error``
+        (``None`` on success). A failed download doesn't stop the others.
+        Files with the same name as an earlier file of the list fail without
+        being downloaded, as they would overwrite it.
+
+        :param target_files: List of `DriveItem` objects or file paths.
+        :param to_path: Destination folder of the downloaded files,
+                defaults to the current directory.
+        :param resource: Name of the resource if not using default.
+        :param drive_id: Drive ID if not using default.
+        :param max_workers: Maximum number of simultaneous downloads.
+        :return: List of results in the same order as ``target_files``.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Download files
+                ${files}=    List Files In Onedrive Folder    /Invoices
+                ${results}=    Download Files From Onedrive
+                ...    ${files}
+                ...    /path/to/local/folder
+                FOR    ${result}    IN    @{results}
+                    Log    ${result}[path]
+                    Log    ${result}[size]
+                    Log    ${result}[error]
+                END
+        """
+        self._require_authentication()
+        drive_instance = self._get_drive_instance(resource, drive_id)
+        return self._download_files(drive_instance, target_files, to_path, max_workers)
 
     @keyword
     def download_folder_from_onedrive(
@@ -584,7 +2104,11 @@ class MSGraph:
         to_path: Union[Path, str, None] = None,
         resource: Optional[str] = None,
         drive_id: Optional[str] = None,
-    ) -> Path:
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        return_manifest: bool = False,
+        mirror: bool = False,
+        delete_orphans: bool = False,
+    ) -> Union[Path, list[dict]]:
         """Downloads a folder from OneDrive with all of it's contents,
         including subfolders.
 
@@ -596,7 +2120,27 @@ class MSGraph:
                 defaults to the current directory.
         :param resource: Name of the resource if not using default.
         :param drive_id: Drive ID if not using default.
-        :return: Path to the downloaded folder.
+        :param max_workers: Maximum number of simultaneous requests.
+        :param return_manifest: Return the manifest of downloaded files
+         instead of the folder path.
+        :param mirror: Only download files that changed since the last
+         download into the same local folder.
+        :param delete_orphans: Delete local files and folders that no longer
+         exist in OneDrive, only used with ``mirror``.
+        :return: Path to the downloaded folder, or the manifest.
+
+        Subfolders are listed and files are downloaded in parallel. The
+        manifest has one dictionary per file with the keys ``source``
+        (path relative to the downloaded folder), ``path``, ``size``,
+        ``elapsed`` (seconds) and ``error`` (``None`` on success). Without
+        ``return_manifest``, an error listing the failed files is raised
+        once the other files are downloaded.
+
+        In mirror mode, an index of the downloaded files is kept in a
+        ``.mirror-index.json`` file next to the local folder. Files whose
+        size and ``quickXorHash`` or ``sha1Hash`` reported by OneDrive match
+        the local copy are skipped, and the manifest entries get an
+        ``action`` key with ``downloaded``, ``skipped`` or ``deleted``.
 
         .. code-block: robotframework
 
@@ -610,11 +2154,42 @@ class MSGraph:
                 ${download_path}=    Download Folder From Onedrive
                 ...    ${drive_item}
                 ...    /path/to/local/folder
+
+            Download folder with manifest
+                ${manifest}=    Download Folder From Onedrive
+                ...    /path/to/onedrive/folder
+                ...    /path/to/local/folder
+                ...    return_manifest=${TRUE}
+                FOR    ${file}    IN    @{manifest}
+                    Log    ${file}[path] ${file}[size] ${file}[elapsed]
+                END
+
+            Mirror folder
+                Download Folder From Onedrive
+                ...    /path/to/onedrive/folder
+                ...    /path/to/local/folder
+                ...    mirror=${TRUE}
+                ...    delete_orphans=${TRUE}
         """
         self._require_authentication()
         drive_instance = self._get_drive_instance(resource, drive_id)
         folder_instance = self._get_folder_instance(drive_instance, target_folder)
-        return self._download_folder(folder_instance, to_path)
+        downloaded_folder, manifest = self._download_folder(
+            folder_instance, to_path, max_workers, mirror, delete_orphans
+        )
+        if return_manifest:
+            return manifest
+        failed = [entry for entry in manifest if entry["error"]]
+        if failed:
+            raise MSGraphDownloadError(
+                "Downloading {} files failed: {}".format(
+                    len(failed),
+                    ", ".join(
+                        f"{entry['source']} ({entry['error']})" for entry in failed
+                    ),
+                )
+            )
+        return downloaded_folder
 
     @keyword
     def find_onedrive_file(
@@ -624,7 +2199,8 @@ class MSGraph:
         include_folders: Optional[bool] = False,
         resource: Optional[str] = None,
         drive_id: Optional[str] = None,
-    ) -> list[drive.DriveItem]:
+        fields: Union[list[str], str, None] = None,
+    ) -> list[Union[drive.DriveItem, dict]]:
         # pylint: disable=anomalous-backslash-in-string
         """Returns a list of files found in OneDrive based on the search string.
         If a folder is not specified, the search is done in the entire drive and
@@ -633,7 +2209,8 @@ class MSGraph:
 
         The files returned are DriveItem objects and they have additional
         properties that can be accessed with dot-notation, see
-        \`List Files In Onedrive Folder\` for details.
+        \`List Files In Onedrive Folder\` for details. When ``fields`` are
+        given, dictionaries with only those properties are returned instead.
 
         :param search_string: String used to search for file in OneDrive.
          Values may be matched across several fields including filename,
@@ -642,6 +2219,8 @@ class MSGraph:
         :param include_folders: Boolean indicating if should return folders as well.
         :param resource: Name of the resource if not using default.
         :param drive_id: Drive ID if not using default.
+        :param fields: Graph properties to request, as a list or a comma
+         separated string.
         :return: List of DriveItems found based on the search string.
 
         .. code-block: robotframework
@@ -652,6 +2231,15 @@ class MSGraph:
         """  # noqa: W605
         self._require_authentication()
         drive_instance = self._get_drive_instance(resource, drive_id)
+        if fields:
+            parent = drive_instance
+            if target_folder:
+                parent = self._get_folder_instance(drive_instance, target_folder)
+            return list(
+                self._iter_search_results(
+                    search_string, parent, include_folders, fields
+                )
+            )
         if target_folder:
             folder = self._get_folder_instance(drive_instance, target_folder)
             items = folder.search(search_string)
@@ -710,6 +2298,9 @@ class MSGraph:
         target_folder: Union[drive.Folder, str, None] = None,
         resource: Optional[str] = None,
         drive_id: Optional[str] = None,
+        resumable: bool = False,
+        chunk_size: int = drive.DEFAULT_UPLOAD_CHUNK_SIZE,
+        state_file: Union[Path, str, None] = None,
     ) -> drive.DriveItem:
         # pylint: disable=anomalous-backslash-in-string
         """Uploads a file to the specified OneDrive folder.
@@ -718,10 +2309,22 @@ class MSGraph:
         additional properties that can be accessed with dot-notation, see
         \`List Files In Onedrive Folder\` for details.
 
+        Large files should be uploaded with ``resumable`` enabled. The file
+        is then sent in chunks through an upload session, whose URL and
+        uploaded byte offset are saved to a local state file after every
+        chunk. If the upload is interrupted, calling the keyword again with
+        the same file and folder resumes it where it stopped. The state
+        file is removed once the upload completes.
+
         :param file_path: Path of the local file being uploaded.
         :param target_folder: Path of the folder in OneDrive.
         :param resource: Name of the resource if not using default.
         :param drive_id: Drive ID if not using default.
+        :param resumable: Upload in chunks through a resumable upload session.
+        :param chunk_size: Bytes sent per request in resumable mode, must be
+         a multiple of 327680 (320 KiB). Defaults to 5 MiB.
+        :param state_file: Where the upload session is saved, defaults to the
+         file path with a ``.upload-session.json`` suffix.
 
         .. code-block: robotframework
 
@@ -730,12 +2333,172 @@ class MSGraph:
                 ${file}=    Upload File To Onedrive
                 ...    /path/to/file.txt
                 ...    /path/to/folder
+
+            Upload large file
+                ${file}=    Wait Until Keyword Succeeds    5x    1 min
+                ...    Upload File To Onedrive
+                ...    /path/to/backup.zip
+                ...    /path/to/folder
+                ...    resumable=${TRUE}
+                ...    chunk_size=${10485760}
         """  # noqa: W605
         self._require_authentication()
         drive_instance = self._get_drive_instance(resource, drive_id)
         folder = self._get_folder_instance(drive_instance, target_folder)
+        # The folder's size and child count change with the upload.
+        self._cache.invalidate(folder)
+        if resumable:
+            return self._upload_file_in_session(
+                folder, file_path, chunk_size, state_file
+            )
         return folder.upload_file(item=file_path)
 
+    @keyword
+    def upload_files_to_onedrive(
+        self,
+        source: Union[Path, str],
+        target_folder: Union[drive.Folder, str, None] = None,
+        resource: Optional[str] = None,
+        drive_id: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> list[dict]:
+        # pylint: disable=anomalous-backslash-in-string
+        """Uploads many files to the specified OneDrive folder in parallel.
+
+        If ``source`` is a local directory, all of its files are uploaded
+        and its subdirectories are recreated under the target folder.
+        Otherwise ``source`` is used as a glob pattern, e.g. ``/data/*.csv``
+        or ``/data/**/*.pdf``, and the matching files are uploaded directly
+        to the target folder. Missing remote folders are created, and every
+        remote folder is looked up only once.
+
+        Each result is a dictionary with the keys ``source`` (local path),
+        ``target`` (remote path relative to the target folder), ``item``
+        (the uploaded DriveItem, ``None`` on failure), ``size``, ``elapsed``
+        (seconds) and ``error`` (``None`` on success). A failed upload
+        doesn't stop the others.
+
+        :param source: Local directory or glob pattern of the files.
+        :param target_folder: Path of the folder in OneDrive.
+        :param resource: Name of the resource if not using default.
+        :param drive_id: Drive ID if not using default.
+        :param max_workers: Maximum number of simultaneous uploads.
+        :return: List of results, one per local file.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Upload directory
+                ${results}=    Upload Files To Onedrive
+                ...    /path/to/local/folder
+                ...    /path/to/folder
+
+            Upload matching files
+                ${results}=    Upload Files To Onedrive
+                ...    /path/to/reports/*.xlsx
+                ...    /path/to/folder
+                FOR    ${result}    IN    @{results}
+                    Log    ${result}[target] ${result}[error]
+                END
+        """  # noqa: W605
+        self._require_authentication()
+        files = self._collect_upload_files(source)
+        drive_instance = self._get_drive_instance(resource, drive_id)
+        base_folder = self._get_folder_instance(drive_instance, target_folder)
+        folders = self._resolve_upload_folders(
+            base_folder, {relative_folder for _, relative_folder in files}
+        )
+
+        def upload(upload_file: tuple[Path, PurePosixPath]) -> dict:
+            file_path, relative_folder = upload_file
+            target = (relative_folder / file_path.name).as_posix()
+            return self._upload_with_result(file_path, folders[relative_folder], target)
+
+        for folder in folders.values():
+            self._cache.invalidate(folder)
+        with ThreadPoolExecutor(max_workers=int(max_workers)) as executor:
+            return list(executor.map(upload, files))
+
+    @keyword
+    def sync_drive_changes(
+        self,
+        state_file: Union[Path, str],
+        target_folder: Union[drive.Folder, str, None] = None,
+        to_folder: Union[Path, str, None] = None,
+        resource: Optional[str] = None,
+        drive_id: Optional[str] = None,
+        site: Optional[sharepoint.Site] = None,
+    ) -> list[dict]:
+        # pylint: disable=anomalous-backslash-in-string
+        """Returns the items added, modified or deleted in a OneDrive or
+        SharePoint folder since the last time this keyword was run with the
+        same state file.
+
+        The changes are requested with the Graph delta query and the delta
+        link is kept in ``state_file``, so every run only fetches what
+        changed. The first run, or a run after the delta link has expired,
+        returns every item in the folder as added. When ``to_folder`` is
+        given, the changes are also applied to that local folder: files are
+        downloaded, moved folders are renamed and deleted items removed.
+        The state file is only updated when all changes were mirrored, so
+        failed downloads are retried on the next run.
+
+        Each change is a dictionary with ``id``, ``name``, ``path`` relative
+        to the synced folder, ``previous_path`` when the item was moved or
+        renamed, ``change`` (``added``, ``modified`` or ``deleted``),
+        ``is_folder``, ``size``, ``last_modified``, ``local_path`` and
+        ``error``.
+
+        OneDrive for Business and SharePoint only support syncing the root
+        of the drive, other folders can be synced in personal OneDrives.
+
+        :param state_file: Path of the local file keeping the sync state.
+        :param target_folder: Folder to sync, the root of the drive if none.
+        :param to_folder: Local folder where the changes are mirrored.
+        :param resource: Name of the resource if not using default.
+        :param drive_id: Drive ID if not using default.
+        :param site: Site instance obtained from \`Get Sharepoint Site\`
+         to sync one of its drives instead of a OneDrive.
+        :return: List of changes since the last sync.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Process new invoices
+                ${changes}=    Sync Drive Changes    invoices.delta.json
+                ...    target_folder=/Invoices    to_folder=${OUTPUT_DIR}/invoices
+                FOR    ${change}    IN    @{changes}
+                    Log    ${change}[change]: ${change}[path]
+                END
+        """  # noqa: W605
+        self._require_authentication()
+        if site is not None:
+            drive_instance = self._get_sharepoint_drive(site, drive_id)
+        else:
+            drive_instance = self._get_drive_instance(resource, drive_id)
+        folder = self._get_folder_instance(drive_instance, target_folder)
+        state_file = Path(state_file)
+        state = self._load_sync_state(state_file, folder_id=folder.object_id)
+        changes, delta_link = self._fetch_drive_delta(folder, state)
+        records = []
+        for data in changes:
+            if data["id"] == folder.object_id or "root" in data:
+                continue
+            record = self._record_drive_change(data, state["items"])
+            if to_folder is not None:
+                try:
+                    self._mirror_drive_change(folder, data, record, Path(to_folder))
+                except Exception as err:  # pylint: disable=broad-except
+                    self.logger.warning("Syncing %s failed: %s", record["path"], err)
+                    record["error"] = str(err)
+            records.append(record)
+        if any(record["error"] for record in records):
+            self.logger.warning("Sync state not saved as some changes failed.")
+        else:
+            state["delta_link"] = delta_link
+            self._save_sync_state(state_file, state)
+        return records
+
     @keyword
     def get_sharepoint_site(
         self, *args: str, resource: Optional[str] = ""
@@ -782,8 +2545,15 @@ class MSGraph:
         self,
         list_name: str,
         site: sharepoint.Site,
-    ) -> DataTable:
-        # pylint: disable=anomalous-backslash-in-string
+        filter: Optional[str] = None,
+        select_fields: Union[list[str], str, None] = None,
+        order_by: Optional[str] = None,
+        top: Optional[int] = None,
+        stream: bool = False,
+        chunk_size: Optional[int] = None,
+        as_columns: bool = False,
+    ) -> Union[DataTable, dict, Iterator]:
+        # pylint: disable=anomalous-backslash-in-string,redefined-builtin
         """Returns the items on a SharePoint list. The list is found
         by it's display name.
 
@@ -791,27 +2561,160 @@ class MSGraph:
         (see ``RPA.Tables``), if ``RPA.Tables`` is not available in the
         keyword's scope, the data will be returned as a list of dictionaries.
 
+        The filtering, ordering and column selection are done by Graph, so
+        only the requested rows and columns are transferred. Filtering on
+        columns which are not indexed is allowed, but may fail on lists with
+        more than 5000 items.
+
+        With ``stream`` enabled, an iterator is returned instead of a table.
+        It yields the items as each page is received from Graph, so large
+        lists never have all their items in memory at once. With
+        ``chunk_size`` too, it yields tables of at most that many items
+        instead of single items.
+
+        With ``as_columns`` enabled, the items are returned as a dictionary
+        with a list of values per column, which is the most compact form for
+        large lists.
+
         :param list_name: Display name of the SharePoint list.
         :param site: Site instance obtained from \`Get Sharepoint Site\`.
-        :return: Table or list of dicts of the items.
+        :param filter: OData filter on the item fields, for example
+         ``fields/Status eq 'Open'``.
+        :param select_fields: List or comma separated string of the column
+         names to return. All columns are returned by default.
+        :param order_by: OData ordering, for example
+         ``fields/Modified desc``.
+        :param top: Maximum number of items to return.
+        :param stream: Boolean indicating if should return an iterator
+         instead of a table.
+        :param chunk_size: Number of items in each table yielded when
+         streaming, items are yielded one by one as dictionaries by default.
+        :param as_columns: Boolean indicating if should return a dictionary
+         of columns instead of a table.
+        :return: Table or list of dicts of the items, or an iterator of them.
 
         .. code-block: robotframework
 
             *** Tasks ***
             Get List
                 ${table}=    Get Items From Sharepoint List    My List    ${site}
+
+            Get Open Tasks
+                ${table}=    Get Items From Sharepoint List    My List    ${site}
+                ...    filter=fields/Status eq 'Open'
+                ...    select_fields=Title,Status
+                ...    order_by=fields/Title
+                ...    top=100
+
+            Process Large List
+                ${chunks}=    Get Items From Sharepoint List    My List    ${site}
+                ...    stream=${TRUE}    chunk_size=5000
+                FOR    ${table}    IN    @{chunks}
+                    Write Table To Csv    ${table}    items.csv    header=${FALSE}
+                END
         """  # noqa: W605
         self._require_authentication()
         sp_list = site.get_list_by_name(list_name)
-        sp_items = sp_list.get_items(expand_fields=True)
-        items = self._sharepoint_items_into_dict_list(sp_items)
-
-        if not Table:
+        max_top = sp_list.protocol.max_top_value
+        params = {
+            "$top": min(int(top), max_top) if top else max_top,
+            "$expand": self._list_fields_expand(select_fields),
+        }
+        headers = {}
+        if filter:
+            params["$filter"] = filter
+            headers["Prefer"] = "HonorNonIndexedQueriesWarningMayFailRandomly"
+        if order_by:
+            params["$orderby"] = order_by
+        items = self._iter_sharepoint_list_items(
+            sp_list, params, int(top) if top else None, headers
+        )
+        if not Table and not as_columns:
             self.logger.info(
                 "Tables in the response will be in a `dictionary` type, "
                 "because `RPA.Tables` library is not available in the scope."
             )
-        return DataTable(items) if Table else items
+        if stream and chunk_size:
+            return self._iter_table_chunks(items, chunk_size, as_columns)
+        if stream:
+            return map(self._sharepoint_item_into_dict, items)
+        columns = self._sharepoint_items_into_columns(items)
+        return self._columns_into_table(columns, as_columns)
+
+    @keyword
+    def sync_sharepoint_list(
+        self,
+        list_name: str,
+        site: sharepoint.Site,
+        state_file: Union[Path, str],
+        select_fields: Union[list[str], str, None] = None,
+        as_columns: bool = False,
+    ) -> tuple[Union[DataTable, dict], list[dict]]:
+        # pylint: disable=anomalous-backslash-in-string
+        """Returns the current items of a SharePoint list together with the
+        items added, modified or deleted since the last time this keyword
+        was run with the same state file. The list is found by it's display
+        name.
+
+        The changes are requested with the Graph delta query and applied to
+        a snapshot of the list kept in ``state_file`` with the delta link,
+        so every run only fetches what changed instead of the whole list.
+        The first run, or a run after the delta link has expired, fetches
+        every item and returns them all as added.
+
+        Each change is a dictionary with ``object_id``, ``change``
+        (``added``, ``modified`` or ``deleted``) and the item ``fields``,
+        which are empty for deleted items.
+
+        :param list_name: Display name of the SharePoint list.
+        :param site: Site instance obtained from \`Get Sharepoint Site\`.
+        :param state_file: Path of the local file keeping the list snapshot.
+        :param select_fields: List or comma separated string of the column
+         names to keep. All columns are kept by default. Changing the columns
+         syncs all items again.
+        :param as_columns: Boolean indicating if should return the items as
+         a dictionary of columns instead of a table.
+        :return: Table of the current items and list of changes.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Process changed orders
+                ${table}    ${changes}=    Sync Sharepoint List
+                ...    Orders    ${site}    orders.snapshot.json
+                FOR    ${change}    IN    @{changes}
+                    Log    ${change}[change]: ${change}[object_id]
+                END
+        """  # noqa: W605
+        self._require_authentication()
+        sp_list = site.get_list_by_name(list_name)
+        if isinstance(select_fields, str):
+            select_fields = [field.strip() for field in select_fields.split(",")]
+        state_file = Path(state_file)
+        state = self._load_sync_state(
+            state_file, list_id=sp_list.object_id, fields=select_fields or None
+        )
+        url = self._endpoint_url(sp_list, "get_items") + "/delta"
+        params = {"$expand": self._list_fields_expand(select_fields)}
+        items, delta_link = self._fetch_delta(url, state, params)
+        snapshot = state["items"]
+        changes = []
+        for data in items:
+            item_id = data["id"]
+            if "deleted" in data:
+                if snapshot.pop(item_id, None) is None:
+                    continue
+                change, fields = "deleted", {}
+            else:
+                change = "modified" if item_id in snapshot else "added"
+                fields = snapshot[item_id] = data.get("fields", {})
+            changes.append({"object_id": item_id, "change": change, "fields": fields})
+        state["delta_link"] = delta_link
+        self._save_sync_state(state_file, state)
+        columns = self._sharepoint_items_into_columns(
+            {"id": item_id, "fields": fields} for item_id, fields in snapshot.items()
+        )
+        return self._columns_into_table(columns, as_columns), changes
 
     @keyword
     def create_sharepoint_list(
@@ -850,6 +2753,120 @@ class MSGraph:
         self._require_authentication()
         return site.create_list(list_data)
 
+    @keyword
+    def add_items_to_sharepoint_list(
+        self,
+        list_name: str,
+        site: sharepoint.Site,
+        items: DataTable,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> list[dict]:
+        # pylint: disable=anomalous-backslash-in-string
+        """Adds items to a SharePoint list. The list is found by it's display
+        name.
+
+        The items are sent 20 at a time through Graph batch requests, with
+        several batches in flight at once. Items throttled inside a batch
+        are sent again after the time requested by Graph. A failing item
+        doesn't stop the others, check the returned results instead.
+
+        :param list_name: Display name of the SharePoint list.
+        :param site: Site instance obtained from \`Get Sharepoint Site\`.
+        :param items: Table or list of dictionaries, one per item, with the
+         column names as keys. An ``object_id`` key is ignored.
+        :param max_workers: Maximum number of simultaneous batch requests.
+        :return: List with one result per item, in the same order, with the
+         keys ``index``, ``object_id`` of the new item, ``status`` and
+         ``error`` (``None`` on success).
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Add items
+                ${results}=    Add Items To Sharepoint List
+                ...    My List    ${site}    ${table}
+                FOR    ${result}    IN    @{results}
+                    IF    $result["error"]
+                        Log    Row ${result}[index] failed: ${result}[error]
+                    END
+                END
+        """  # noqa: W605
+        self._require_authentication()
+        sp_list = site.get_list_by_name(list_name)
+        url = self._endpoint_url(sp_list, "get_items")
+        rows = self._table_to_dict_list(items)
+        requests = [
+            {
+                "method": "POST",
+                "url": url,
+                "body": {"fields": {k: v for k, v in row.items() if k != "object_id"}},
+            }
+            for row in rows
+        ]
+        responses = self._send_batched(requests, max_workers)
+        return [
+            self._list_item_result(index, None, response)
+            for index, response in enumerate(responses)
+        ]
+
+    @keyword
+    def update_sharepoint_list_items(
+        self,
+        list_name: str,
+        site: sharepoint.Site,
+        items: DataTable,
+        id_column: str = "object_id",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> list[dict]:
+        # pylint: disable=anomalous-backslash-in-string
+        """Updates items of a SharePoint list. The list is found by it's
+        display name.
+
+        Only the columns present in each item are updated. Read-only system
+        fields returned by \`Get Items From Sharepoint List\`, like
+        ``Created``, ``Modified``, lookup IDs and OData annotations, are left
+        out. The items are sent in batches the same way as
+        \`Add Items To Sharepoint List\`.
+
+        :param list_name: Display name of the SharePoint list.
+        :param site: Site instance obtained from \`Get Sharepoint Site\`.
+        :param items: Table or list of dictionaries, one per item, with the
+         column names as keys, like the ones returned by
+         \`Get Items From Sharepoint List\`.
+        :param id_column: Key holding the ID of each item.
+        :param max_workers: Maximum number of simultaneous batch requests.
+        :return: List with one result per item, in the same order, with the
+         keys ``index``, ``object_id``, ``status`` and ``error``
+         (``None`` on success).
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Update items
+                ${table}=    Get Items From Sharepoint List    My List    ${site}
+                Set Table Column    ${table}    Status    Done
+                ${results}=    Update Sharepoint List Items
+                ...    My List    ${site}    ${table}
+        """  # noqa: W605
+        self._require_authentication()
+        sp_list = site.get_list_by_name(list_name)
+        rows = self._table_to_dict_list(items)
+        item_ids = [str(row[id_column]) for row in rows]
+        requests = [
+            {
+                "method": "PATCH",
+                "url": self._endpoint_url(sp_list, "get_item_by_id", item_id=item_id)
+                + "/fields",
+                "body": self._writable_list_fields(row, id_column),
+            }
+            for item_id, row in zip(item_ids, rows)
+        ]
+        responses = self._send_batched(requests, max_workers)
+        return [
+            self._list_item_result(index, item_id, response)
+            for index, (item_id, response) in enumerate(zip(item_ids, responses))
+        ]
+
     @keyword
     def list_sharepoint_site_drives(self, site: sharepoint.Site) -> list[drive.Drive]:
         # pylint: disable=anomalous-backslash-in-string
@@ -880,7 +2897,8 @@ class MSGraph:
         site: sharepoint.Site,
         include_folders: Optional[bool] = False,
         drive_id: Optional[str] = None,
-    ) -> list[drive.DriveItem]:
+        fields: Union[list[str], str, None] = None,
+    ) -> list[Union[drive.DriveItem, dict]]:
         # pylint: disable=anomalous-backslash-in-string
         """List files in the SharePoint Site drive.
 
@@ -889,11 +2907,14 @@ class MSGraph:
 
         The files returned are DriveItem objects and they have additional
         properties that can be accessed with dot-notation, see
-        \`List Files In Onedrive Folder\` for details.
+        \`List Files In Onedrive Folder\` for details. When ``fields`` are
+        given, dictionaries with only those properties are returned instead.
 
         :param site: Site instance obtained from \`Get Sharepoint Site\`.
         :param include_folders: Boolean indicating if should return folders as well.
         :param drive_id: ID of the desired drive.
+        :param fields: Graph properties to request, as a list or a comma
+         separated string.
         :return: List of DriveItems present in the Site Drive.
 
         .. code-block: robotframework
@@ -906,6 +2927,8 @@ class MSGraph:
         self._require_authentication()
         sp_drive = self._get_sharepoint_drive(site, drive_id)
         folder = self._get_folder_instance(sp_drive)
+        if fields:
+            return list(self._iter_folder_items(folder, include_folders, fields=fields))
         items = folder.get_items()
         if include_folders:
             return items
@@ -919,6 +2942,8 @@ class MSGraph:
         to_path: Union[Path, str, None] = None,
         name: Optional[str] = None,
         drive_id: Optional[str] = None,
+        segment_threshold: Optional[int] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
     ) -> Path:
         # pylint: disable=anomalous-backslash-in-string
         """Downloads file from SharePoint.
@@ -931,6 +2956,10 @@ class MSGraph:
                 defaults to the current directory.
         :param name: New name for the downloaded file, with or without extension.
         :param drive_id: Drive ID if not using default.
+        :param segment_threshold: Size in bytes from which the file is
+         downloaded with parallel range requests and its hash verified,
+         disabled by default.
+        :param max_workers: Maximum number of simultaneous range requests.
         :return: Path to the downloaded file.
 
         .. code-block: robotframework
@@ -953,4 +2982,106 @@ class MSGraph:
         self._require_authentication()
         sp_drive = self._get_sharepoint_drive(site, drive_id)
         file_instance = self._get_file_instance(target_file, sp_drive)
-        return self._download_file(file_instance, to_path, name)
+        return self._download_file(
+            file_instance, to_path, name, segment_threshold, max_workers
+        )
+
+    @keyword
+    def download_files_from_sharepoint(
+        self,
+        target_files: list[Union[drive.File, str]],
+        site: sharepoint.Site,
+        to_path: Union[Path, str, None] = None,
+        drive_id: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> list[dict]:
+        # pylint: disable=anomalous-backslash-in-string
+        """Downloads several files from SharePoint in parallel.
+
+        The results are described in \`Download Files From Onedrive\`.
+
+        :param target_files: List of `DriveItem` objects or file paths.
+        :param site: Site instance obtained from \`Get Sharepoint Site\`.
+        :param to_path: Destination folder of the downloaded files,
+                defaults to the current directory.
+        :param drive_id: Drive ID if not using default.
+        :param max_workers: Maximum number of simultaneous downloads.
+        :return: List of results in the same order as ``target_files``.
+
+        .. code-block: robotframework
+
+            *** Tasks ***
+            Download files
+                ${files}=    List Files In Sharepoint Site Drive    ${site}
+                ${results}=    Download Files From Sharepoint
+                ...    ${files}
+                ...    ${site}
+                ...    /path/to/local/folder
+        """  # noqa: W605
+        self._require_authentication()
+        sp_drive = self._get_sharepoint_drive(site, drive_id)
+        return self._download_files(sp_drive, target_files, to_path, max_workers)
+
+
+class AsyncMSGraph:
+    """Asyncio interface to an ``MSGraph`` library instance, for Python code
+    fanning out many Graph calls, such as listing hundreds of user drives.
+
+    Every public method of the library, like ``list_files_in_onedrive_folder``
+    or ``get_sharepoint_site``, is available as a coroutine with the same
+    arguments. The calls run in a pool of ``max_concurrency`` threads, so they
+    can be awaited together with ``asyncio.gather`` while sharing the pooled
+    session, retries and rate limit of the library. The library ``pool_size``
+    should be at least ``max_concurrency``.
+
+    Iterators returned by streaming keywords are consumed in the event loop,
+    so they should not be used through this interface.
+
+    .. code-block: python
+
+        async def list_user_drives(library, user_ids):
+            async with AsyncMSGraph(library, max_concurrency=32) as graph:
+                return await asyncio.gather(
+                    *(
+                        graph.list_files_in_onedrive_folder(
+                            resource=f"users/{user_id}"
+                        )
+                        for user_id in user_ids
+                    )
+                )
+    """
+
+    def __init__(self, library: MSGraph, max_concurrency: int = DEFAULT_MAX_WORKERS):
+        self.library = library
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(max_concurrency), thread_name_prefix="msgraph"
+        )
+
+    async def run(self, function: Callable, *args, **kwargs) -> Any:
+        """Runs the blocking function in the thread pool and returns its
+        result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+    def __getattr__(self, name: str) -> Callable:
+        function = getattr(self.library, name)
+        if name.startswith("_") or not callable(function):
+            raise AttributeError(name)
+
+        @functools.wraps(function)
+        async def call(*args, **kwargs):
+            return await self.run(function, *args, **kwargs)
+
+        return call
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncMSGraph":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
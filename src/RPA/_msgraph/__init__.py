@@ -0,0 +1 @@
+"""Building blocks of the RPA.MSGraph library."""
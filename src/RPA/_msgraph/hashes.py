@@ -0,0 +1,152 @@
+"""File hashes and the index used to mirror drive folders locally."""
+import base64
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+MIRROR_INDEX_SUFFIX = ".mirror-index.json"
+
+
+class QuickXorHash:
+    """Computes the QuickXorHash that OneDrive for Business and SharePoint
+    report for files, so local copies can be compared without downloading.
+    """
+
+    WIDTH = 160
+    SHIFT = 11
+
+    def __init__(self):
+        self._blocks = 0
+        self._pending = b""
+        self._length = 0
+
+    def update(self, data: bytes) -> None:
+        """Adds the data to the hash. The bytes at the same position of every
+        160 byte block are shifted by the same amount, so all the blocks are
+        folded into one with XOR before shifting their bytes.
+        """
+        self._length += len(data)
+        data = self._pending + data
+        aligned = len(data) - len(data) % self.WIDTH
+        self._pending = data[aligned:]
+        count = aligned // self.WIDTH
+        value = int.from_bytes(data[:aligned], "little")
+        while count > 1:
+            half = (count + 1) // 2
+            bits = half * self.WIDTH * 8
+            value = (value & ((1 << bits) - 1)) ^ (value >> bits)
+            count = half
+        self._blocks ^= value
+
+    def digest(self) -> bytes:
+        block = (self._blocks ^ int.from_bytes(self._pending, "little")).to_bytes(
+            self.WIDTH, "little"
+        )
+        result = 0
+        for position, byte in enumerate(block):
+            shift = position * self.SHIFT % self.WIDTH
+            result ^= byte << shift | byte >> (self.WIDTH - shift)
+        result &= (1 << self.WIDTH) - 1
+        result ^= self._length << (self.WIDTH - 64)
+        return result.to_bytes(self.WIDTH // 8, "little")
+
+    def base64digest(self) -> str:
+        return base64.b64encode(self.digest()).decode()
+
+
+class FolderMirrorIndex:
+    """Index of the files mirrored into a local folder, kept in a JSON file
+    next to the folder. Files whose size, modification time and remote hash
+    match the index are not downloaded again.
+    """
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        resolved = folder.resolve()
+        self.path = resolved.with_name(resolved.name + MIRROR_INDEX_SUFFIX)
+        self._previous = {}
+        if self.path.exists():
+            self._previous = json.loads(self.path.read_text(encoding="utf-8"))
+        self._entries: Dict[str, dict] = {}
+        self._remote = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def remote_hash(data: dict) -> Optional[list[str]]:
+        """Returns the type and value of the best hash Graph reported."""
+        hashes = data.get("file", {}).get("hashes", {})
+        for hash_type in ("quickXorHash", "sha1Hash"):
+            if hashes.get(hash_type):
+                return [hash_type, hashes[hash_type]]
+        return None
+
+    @staticmethod
+    def local_hash(local_path: Path, hash_type: str) -> str:
+        hasher = QuickXorHash() if hash_type == "quickXorHash" else hashlib.sha1()
+        with open(local_path, "rb") as file:
+            for chunk in iter(lambda: file.read(QuickXorHash.WIDTH * 8192), b""):
+                hasher.update(chunk)
+        if hash_type == "quickXorHash":
+            return hasher.base64digest()
+        return hasher.hexdigest().upper()
+
+    @classmethod
+    def matches_hash(cls, local_path: Path, remote_hash: list[str]) -> bool:
+        hash_type, expected = remote_hash
+        if hash_type == "sha1Hash":
+            expected = expected.upper()
+        return cls.local_hash(local_path, hash_type) == expected
+
+    def add_folder(self, source: str) -> None:
+        with self._lock:
+            self._remote.add(source)
+
+    def is_current(self, source: str, data: dict) -> bool:
+        """Returns whether the local copy of the remote file is up to date."""
+        with self._lock:
+            self._remote.add(source)
+        local_path = self.folder / source
+        if not local_path.is_file():
+            return False
+        stat = local_path.stat()
+        if stat.st_size != data.get("size"):
+            return False
+        remote_hash = self.remote_hash(data)
+        entry = self._previous.get(source, {})
+        if entry.get("mtime_ns") == stat.st_mtime_ns:
+            if remote_hash is not None:
+                return entry.get("hash") == remote_hash
+            return entry.get("modified") == data.get("lastModifiedDateTime")
+        if remote_hash is None:
+            return False
+        return self.matches_hash(local_path, remote_hash)
+
+    def add_file(self, source: str, data: dict) -> None:
+        """Records the local copy of the remote file as up to date."""
+        entry = {
+            "size": data.get("size"),
+            "mtime_ns": (self.folder / source).stat().st_mtime_ns,
+            "hash": self.remote_hash(data),
+            "modified": data.get("lastModifiedDateTime"),
+        }
+        with self._lock:
+            self._entries[source] = entry
+
+    def orphans(self) -> list[Path]:
+        """Returns the local files and folders missing from the remote
+        folder, the deepest ones first.
+        """
+        orphans = [
+            path
+            for path in self.folder.rglob("*")
+            if path.relative_to(self.folder).as_posix() not in self._remote
+        ]
+        return sorted(orphans, key=lambda path: len(path.parts), reverse=True)
+
+    def save(self) -> None:
+        temp_file = self.path.with_name(self.path.name + ".tmp")
+        temp_file.write_text(json.dumps(self._entries), encoding="utf-8")
+        temp_file.replace(self.path)
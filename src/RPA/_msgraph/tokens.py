@@ -0,0 +1,219 @@
+"""Token backends keeping the OAuth tokens of the MSGraph library."""
+import importlib
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from O365 import FileSystemTokenBackend
+from O365.utils import BaseTokenBackend, Token
+
+try:
+    import fcntl
+
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class MemoryTokenBackend(BaseTokenBackend):
+    """Token backend keeping the token in memory, shared by every backend
+    created with the same ``key`` in the process, so several library
+    instances use one cached token.
+
+    With a ``persistent_backend``, the token is loaded from it the first
+    time and every saved token is written to it in the background, so
+    token access never waits for disk or network I/O.
+    """
+
+    _tokens: Dict[str, Token] = {}
+    _tokens_lock = threading.Lock()
+
+    def __init__(
+        self,
+        key: str = "default",
+        persistent_backend: Optional[BaseTokenBackend] = None,
+    ):
+        super().__init__()
+        self.key = key
+        self.persistent_backend = persistent_backend
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._pending_write: Optional[Future] = None
+
+    def __repr__(self):
+        return f"MemoryTokenBackend({self.key!r})"
+
+    @property
+    def token(self) -> Optional[Token]:
+        return self._tokens.get(self.key)
+
+    @token.setter
+    def token(self, value: Optional[dict]) -> None:
+        if value and not isinstance(value, Token):
+            value = Token(value)
+        with self._tokens_lock:
+            if value:
+                self._tokens[self.key] = value
+            else:
+                self._tokens.pop(self.key, None)
+
+    def load_token(self) -> Optional[Token]:
+        with self._tokens_lock:
+            token = self._tokens.get(self.key)
+            if token is None and self.persistent_backend is not None:
+                token = self.persistent_backend.load_token()
+                if token:
+                    self._tokens[self.key] = token
+        return token
+
+    def save_token(self) -> bool:
+        if self.token is None:
+            raise ValueError('You have to set the "token" first.')
+        if self.persistent_backend is not None:
+            with self._tokens_lock:
+                pending = self._pending_write
+                # A queued write will save this token too.
+                if pending is None or pending.running() or pending.done():
+                    self._pending_write = self._writer.submit(self._write_token)
+        return True
+
+    def _write_token(self) -> None:
+        # Saves the latest token, even if it changed since the write was queued.
+        self.persistent_backend.token = self.token
+        if not self.persistent_backend.save_token():
+            logging.getLogger(__name__).warning("Token could not be persisted.")
+
+    def flush(self) -> None:
+        """Waits until the last saved token is written to the persistent
+        backend.
+        """
+        pending = self._pending_write
+        if pending is not None:
+            pending.result()
+
+    def delete_token(self) -> bool:
+        self.token = None
+        if self.persistent_backend is not None:
+            return self.persistent_backend.delete_token()
+        return True
+
+    def check_token(self) -> bool:
+        return self.load_token() is not None
+
+
+class LockedFileTokenBackend(FileSystemTokenBackend):
+    """File token backend shared by several processes, like parallel robot
+    workers using the same app registration.
+
+    Refreshes are coordinated through an advisory lock on a file next to
+    the token file: the first process to take the lock refreshes the
+    token, the others wait for it and reuse the refreshed token from the
+    file instead of calling the token endpoint again.
+    """
+
+    def __init__(self, token_path=None, token_filename=None):
+        super().__init__(token_path, token_filename)
+        self.lock_path = self.token_path.with_name(self.token_path.name + ".lock")
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Holds the lock shared with the other processes."""
+        with self._thread_lock:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a+b") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def save_token(self) -> bool:
+        if self.token is None:
+            raise ValueError('You have to set the "token" first.')
+        # Replacing the file keeps other processes from reading it half written.
+        self.token_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.token_path.with_name(
+            f"{self.token_path.name}.{os.getpid()}.tmp"
+        )
+        temp_path.write_text(self.serializer.dumps(self.token), encoding="utf-8")
+        temp_path.replace(self.token_path)
+        return True
+
+    def should_refresh_token(self, con=None) -> Optional[bool]:
+        """Refreshes the token through ``con`` while holding the lock, unless
+        another process already saved a newer token, which is then used.
+        """
+        with self.locked():
+            saved = self.load_token()
+            current = self.token or {}
+            if saved and saved.get("expires_at", 0) > current.get("expires_at", 0):
+                self.token = saved
+                return False
+            if con is None:
+                return True
+            if con.refresh_token() is False:
+                raise RuntimeError("Token Refresh Operation not working")
+            return None
+
+
+class RobocorpVaultTokenBackend(BaseTokenBackend):
+    """Token backend that saves the token as JSON in a field of a Robocorp
+    Vault secret.
+
+    Any object with the ``get_secret`` and ``set_secret`` methods of
+    ``RPA.Robocorp.Vault.Vault`` can be given as ``vault``, otherwise the
+    Vault of ``rpaframework`` is used.
+    """
+
+    def __init__(self, secret_name: str, vault: Any = None, field: str = "token"):
+        super().__init__()
+        if vault is None:
+            try:
+                vault = importlib.import_module("RPA.Robocorp.Vault").Vault()
+            except ModuleNotFoundError as err:
+                raise ImportError(
+                    "The Robocorp Vault token backend requires `rpaframework`."
+                ) from err
+        self.vault = vault
+        self.secret_name = secret_name
+        self.field = field
+
+    def __repr__(self):
+        return f"RobocorpVaultTokenBackend({self.secret_name!r})"
+
+    def load_token(self) -> Optional[Token]:
+        value = self.vault.get_secret(self.secret_name).get(self.field)
+        if not value:
+            return None
+        if isinstance(value, str):
+            value = self.serializer.loads(value)
+        return self.token_constructor(value)
+
+    def save_token(self) -> bool:
+        if self.token is None:
+            raise ValueError('You have to set the "token" first.')
+        secret = self.vault.get_secret(self.secret_name)
+        secret[self.field] = self.serializer.dumps(self.token)
+        self.vault.set_secret(secret)
+        return True
+
+    def delete_token(self) -> bool:
+        secret = self.vault.get_secret(self.secret_name)
+        secret[self.field] = ""
+        self.vault.set_secret(secret)
+        return True
+
+    def check_token(self) -> bool:
+        return self.load_token() is not None
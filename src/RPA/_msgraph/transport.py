@@ -0,0 +1,609 @@
+"""Pacing, retries, token refreshes and batching of the Graph requests
+sent by the MSGraph library.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Optional
+
+from O365 import Connection
+from O365.utils.token import EXPIRES_ON_THRESHOLD
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout, HTTPError, Timeout
+from urllib3.exceptions import NewConnectionError
+
+
+GRAPH_BATCH_LIMIT = 20
+DEFAULT_MAX_RETRIES = 5
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_MAX_BACKOFF = 60
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+THROTTLING_STATUS_CODES = (429, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_SIZE = 32
+DEFAULT_TOKEN_REFRESH_MARGIN = 300
+TOKEN_REFRESH_RETRY_DELAY = 30
+
+
+class GraphRequestScheduler:
+    """Rate limits and retries the Graph requests of one tenant. It is
+    shared by every connection and thread using the tenant, so a throttling
+    response pauses all of them for the time Graph asks to wait.
+    """
+
+    _schedulers: Dict[str, "GraphRequestScheduler"] = {}
+    _schedulers_lock = threading.Lock()
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.counters = {"requests": 0, "retried": 0, "throttled": 0}
+        self._tokens = 1.0
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_tenant(cls, tenant_id: str) -> "GraphRequestScheduler":
+        with cls._schedulers_lock:
+            if tenant_id not in cls._schedulers:
+                cls._schedulers[tenant_id] = cls()
+            return cls._schedulers[tenant_id]
+
+    def configure(
+        self,
+        requests_per_second: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        with self._lock:
+            self.requests_per_second = requests_per_second
+            self.max_retries = max_retries
+
+    def statistics(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def _next_wait(self) -> float:
+        """Takes a token from the bucket and returns 0, or returns the
+        seconds to wait for a token or for the tenant pause to end.
+        """
+        now = time.monotonic()
+        if self._paused_until > now:
+            return self._paused_until - now
+        if self.requests_per_second:
+            # The bucket holds up to one second worth of requests, and at
+            # least the one request needed by rates below one per second.
+            self._tokens = min(
+                max(1.0, self.requests_per_second),
+                self._tokens + (now - self._updated_at) * self.requests_per_second,
+            )
+            self._updated_at = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.requests_per_second
+            self._tokens -= 1
+        self.counters["requests"] += 1
+        return 0.0
+
+    def acquire(self) -> None:
+        """Blocks until the request is allowed to be sent."""
+        while True:
+            with self._lock:
+                wait_for = self._next_wait()
+            if wait_for <= 0:
+                return
+            time.sleep(wait_for)
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Returns the seconds given by a ``Retry-After`` header value."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def schedule_retry(
+        self, attempt: int, throttled: bool, retry_after: Optional[float] = None
+    ) -> float:
+        """Counts the retry and returns the seconds to wait before it. A
+        ``retry_after`` given by Graph pauses the whole tenant, otherwise a
+        jittered exponential backoff is used.
+        """
+        with self._lock:
+            self.counters["retried"] += 1
+            if throttled:
+                self.counters["throttled"] += 1
+            if retry_after is None:
+                backoff = min(RETRY_MAX_BACKOFF, RETRY_BACKOFF_FACTOR * 2**attempt)
+                return random.uniform(0, backoff)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        return retry_after
+
+    @staticmethod
+    def is_connect_error(error: Optional[Exception]) -> bool:
+        """Returns True if the request failed before reaching the server."""
+        if isinstance(error, ConnectTimeout):
+            return True
+        if not isinstance(error, RequestsConnectionError) or not error.args:
+            return False
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+
+    @staticmethod
+    def is_retriable_status(method: str, status_code: int, headers: dict) -> bool:
+        """Returns if a request answered with the status can be retried.
+        Non-idempotent requests are only retried when throttled.
+        """
+        if status_code not in RETRY_STATUS_CODES:
+            return False
+        if method.upper() in IDEMPOTENT_METHODS:
+            return True
+        return status_code == 429 or (status_code == 503 and "Retry-After" in headers)
+
+    def retry_delay(
+        self,
+        response: Optional[Response],
+        error: Optional[Exception],
+        attempt: int,
+        method: str = "GET",
+    ) -> Optional[float]:
+        """Returns the seconds to wait before retrying the request, or
+        ``None`` if it should not be retried.
+
+        Requests with non-idempotent methods, like POST and PATCH, may have
+        been applied by the server already, so they are only retried when
+        they were throttled or never reached the server.
+        """
+        if attempt >= self.max_retries:
+            return None
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if response is None:
+            if not isinstance(error, (RequestsConnectionError, Timeout)):
+                return None
+            if not idempotent and not self.is_connect_error(error):
+                return None
+            return self.schedule_retry(attempt, throttled=False)
+        if not self.is_retriable_status(method, response.status_code, response.headers):
+            return None
+        return self.schedule_retry(
+            attempt,
+            response.status_code in THROTTLING_STATUS_CODES,
+            self.parse_retry_after(response.headers.get("Retry-After")),
+        )
+
+
+class GraphTokenRefresher:
+    """Refreshes the access token of a connection ahead of its expiry on a
+    background thread, so requests keep using the current token instead of
+    waiting for a refresh.
+
+    Refreshes are single-flight: threads finding the token already expired
+    wait for the refresh in progress instead of starting their own.
+    """
+
+    def __init__(self, connection: Connection, margin: float):
+        self.connection = connection
+        self.margin = margin
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # Separate from _lock, which is held during refresh requests.
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def expires_at(self) -> Optional[float]:
+        """Returns the timestamp when the access token expires, if known."""
+        token = self.connection.token_backend.token
+        return token.get("expires_at") if token else None
+
+    def can_refresh(self) -> bool:
+        token = self.connection.token_backend.token
+        return bool(token) and (
+            token.is_long_lived or self.connection.auth_flow_type == "credentials"
+        )
+
+    def refresh(self, stale_expires_at: Optional[float] = None) -> bool:
+        """Refreshes the token and returns if it succeeded. When
+        ``stale_expires_at`` is given, the refresh is skipped if the token
+        was already replaced by another thread.
+        """
+        with self._lock:
+            if stale_expires_at is not None and self.expires_at() != stale_expires_at:
+                return True
+            # Backends shared with other processes may refresh the token
+            # themselves (None) or load one refreshed elsewhere (False).
+            should_refresh = self.connection.token_backend.should_refresh_token(
+                self.connection
+            )
+            if should_refresh is True:
+                return self.connection.refresh_token()
+            if should_refresh is False:
+                self.sync_session()
+            return True
+
+    def sync_session(self) -> None:
+        """Updates the session with the backend token when it is newer,
+        which happens when the backend is shared with other connections
+        refreshing the token.
+        """
+        session = self.connection.session
+        token = self.connection.token_backend.token
+        if session is None or not token:
+            return
+        current = session.token if isinstance(session.token, dict) else {}
+        if token.get("expires_at", 0) > current.get("expires_at", 0):
+            session.token = token
+
+    def ensure_valid(self) -> None:
+        """Refreshes the token only if it has already expired, the refresh
+        ahead of expiry being done by the background thread.
+        """
+        self.sync_session()
+        expires_at = self.expires_at()
+        if expires_at is None or time.time() < expires_at - EXPIRES_ON_THRESHOLD:
+            return
+        if self.can_refresh():
+            self.refresh(expires_at)
+
+    def refresh_margin(self) -> float:
+        """Returns the margin capped at half of the token lifetime, as
+        margins as long as the lifetime would refresh the token in a loop.
+        """
+        token = self.connection.token_backend.token
+        lifetime = token.get("expires_in") if token else None
+        if not lifetime:
+            return self.margin
+        return min(self.margin, float(lifetime) / 2)
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self.margin <= 0 or (self._thread and self._thread.is_alive()):
+                return
+            # Tokens that cannot be refreshed would end the thread at once,
+            # it is started again once the token is replaced.
+            if self.expires_at() is None or not self.can_refresh():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="msgraph-token-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            expires_at = self.expires_at()
+            if expires_at is None or not self.can_refresh():
+                return
+            wait_for = expires_at - self.refresh_margin() - time.time()
+            if self._stopped.wait(max(0.0, wait_for)):
+                return
+            try:
+                refreshed = self.refresh(expires_at)
+            except Exception as err:  # pylint: disable=broad-except
+                self.logger.warning("Refreshing the access token failed: %s", err)
+                refreshed = False
+            if refreshed:
+                self.logger.debug("Access token refreshed ahead of expiry.")
+            elif self._stopped.wait(TOKEN_REFRESH_RETRY_DELAY):
+                return
+
+
+class MSGraphConnection(Connection):
+    """O365 connection sending every request through the
+    GraphRequestScheduler of its tenant, which replaces the fixed retries
+    and delay between requests done by O365.
+
+    Its sessions are created once and shared by every keyword and worker
+    thread, with a connection pool sized for concurrent requests so open
+    connections are reused instead of doing a new TLS handshake each time.
+    The access token is refreshed in the background by a
+    GraphTokenRefresher.
+    """
+
+    def __init__(
+        self,
+        *args,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        token_refresh_margin: float = DEFAULT_TOKEN_REFRESH_MARGIN,
+        **kwargs,
+    ):
+        # Retries and pacing are done by the scheduler instead.
+        kwargs["request_retries"] = 0
+        kwargs["requests_delay"] = 0
+        super().__init__(*args, **kwargs)
+        self.scheduler = GraphRequestScheduler.for_tenant(self.tenant_id)
+        self.logger = logging.getLogger(__name__)
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._session_lock = threading.Lock()
+        self._local = threading.local()
+        self.token_refresher = GraphTokenRefresher(self, token_refresh_margin)
+
+    def _configure_pool(self, session: Session) -> Session:
+        adapter = HTTPAdapter(
+            pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=self.pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def get_session(self, *args, **kwargs) -> Session:
+        return self._configure_pool(super().get_session(*args, **kwargs))
+
+    def get_naive_session(self) -> Session:
+        return self._configure_pool(super().get_naive_session())
+
+    def oauth_request(self, url, method, **kwargs):
+        with self._session_lock:
+            if self.session is None:
+                self.session = self.get_session(load_token=True)
+        self.token_refresher.start()
+        self.token_refresher.ensure_valid()
+        return super().oauth_request(url, method, **kwargs)
+
+    def naive_request(self, url, method, **kwargs):
+        with self._session_lock:
+            if self.naive_session is None:
+                self.naive_session = self.get_naive_session()
+        return super().naive_request(url, method, **kwargs)
+
+    @contextmanager
+    def request_headers(self, headers: dict) -> Iterator[None]:
+        """Adds the headers to the requests sent by the current thread,
+        leaving the shared session untouched.
+        """
+        previous = getattr(self._local, "headers", {})
+        self._local.headers = {**previous, **headers}
+        try:
+            yield
+        finally:
+            self._local.headers = previous
+
+    def _internal_request(self, request_obj, url, method, **kwargs):
+        extra_headers = getattr(self._local, "headers", None)
+        if extra_headers:
+            kwargs["headers"] = {**extra_headers, **(kwargs.get("headers") or {})}
+        attempt = 0
+        while True:
+            self.scheduler.acquire()
+            response, error = None, None
+            try:
+                response = super()._internal_request(request_obj, url, method, **kwargs)
+            except HTTPError as err:
+                response, error = err.response, err
+            except (RequestsConnectionError, Timeout) as err:
+                error = err
+            delay = self.scheduler.retry_delay(response, error, attempt, method)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            self.logger.warning(
+                "Retrying %s %s in %.1f seconds.", method.upper(), url, delay
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+class GraphBatch:
+    """Collects Graph API sub-requests and sends them through the JSON
+    ``$batch`` endpoint, up to ``GRAPH_BATCH_LIMIT`` requests per call.
+
+    Requests are sent in ``dependsOn`` order. A request whose dependency
+    failed in an earlier call is not sent and gets a ``424`` response,
+    the same way Graph handles it inside a single batch. Requests throttled
+    inside the batch are resent through the GraphRequestScheduler of the
+    connection, along with the requests that failed depending on them.
+    """
+
+    def __init__(self, con, service_url: str, max_size: int = GRAPH_BATCH_LIMIT):
+        if not 0 < max_size <= GRAPH_BATCH_LIMIT:
+            raise ValueError(f"Batch size must be between 1 and {GRAPH_BATCH_LIMIT}.")
+        self.con = con
+        self.service_url = service_url.rstrip("/")
+        self.max_size = max_size
+        self._requests: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def _relative_url(self, url: str) -> str:
+        """Batch sub-requests use URLs relative to the API version."""
+        if url.startswith(self.service_url):
+            url = url[len(self.service_url) :]
+        return url if url.startswith("/") else "/" + url
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        body: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        depends_on: Optional[list] = None,
+        request_id: Optional[str] = None,
+    ) -> str:
+        """Adds a sub-request to the batch and returns its id."""
+        if request_id is None:
+            # Skips the numbers already taken by explicit ids.
+            number = len(self._requests) + 1
+            while str(number) in self._requests:
+                number += 1
+            request_id = number
+        request_id = str(request_id)
+        if request_id in self._requests:
+            raise ValueError(f"Duplicated batch request id '{request_id}'.")
+        request = {
+            "id": request_id,
+            "method": method.upper(),
+            "url": self._relative_url(url),
+        }
+        if body is not None:
+            request["body"] = body
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        if headers:
+            request["headers"] = headers
+        if depends_on:
+            request["dependsOn"] = [str(dependency) for dependency in depends_on]
+        self._requests[request_id] = request
+        return request_id
+
+    @staticmethod
+    def _ordered_requests(requests: Dict[str, dict]) -> list[dict]:
+        """Sorts the requests so that every request comes after the
+        requests it depends on, keeping the insertion order otherwise.
+        """
+        ordered, done = [], set()
+        pending = list(requests.values())
+        while pending:
+            ready = [r for r in pending if done.issuperset(r.get("dependsOn", []))]
+            if not ready:
+                raise ValueError(
+                    "Batch requests have unknown or circular dependencies."
+                )
+            ordered.extend(ready)
+            done.update(r["id"] for r in ready)
+            pending = [r for r in pending if r["id"] not in done]
+        return ordered
+
+    @staticmethod
+    def _failed_dependency_response(request_id: str, failed: list[str]) -> dict:
+        return {
+            "id": request_id,
+            "status": 424,
+            "headers": {},
+            "body": {
+                "error": {
+                    "code": "failedDependency",
+                    "message": "Dependent request(s) failed: {}".format(
+                        ", ".join(failed)
+                    ),
+                }
+            },
+        }
+
+    def _send(self, requests: list[dict]) -> Dict[str, dict]:
+        response = self.con.post(
+            "{}/$batch".format(self.service_url), data={"requests": requests}
+        )
+        return {r["id"]: r for r in response.json().get("responses", [])}
+
+    def execute(self) -> Dict[str, dict]:
+        """Sends all collected requests and returns the responses by id.
+        The batch is empty afterwards and can be reused.
+        """
+        requests, self._requests = self._requests, {}
+        responses = self._execute(requests)
+        scheduler = getattr(self.con, "scheduler", None)
+        if not isinstance(scheduler, GraphRequestScheduler):
+            return responses
+        attempt = 0
+        while True:
+            retry_ids, delay = set(), 0.0
+            for request_id, response in responses.items():
+                headers = response.get("headers") or {}
+                if (
+                    response["status"] in THROTTLING_STATUS_CODES
+                    and scheduler.is_retriable_status(
+                        requests[request_id]["method"], response["status"], headers
+                    )
+                    and attempt < scheduler.max_retries
+                ):
+                    retry_after = scheduler.parse_retry_after(
+                        headers.get("Retry-After")
+                    )
+                    delay = max(
+                        delay, scheduler.schedule_retry(attempt, True, retry_after)
+                    )
+                    retry_ids.add(request_id)
+            if not retry_ids:
+                return responses
+            retry_ids.update(self._failed_dependents(requests, responses, retry_ids))
+            time.sleep(delay)
+            retry_requests = {}
+            for request_id, request in requests.items():
+                if request_id not in retry_ids:
+                    continue
+                request = dict(request)
+                # Dependencies not resent have succeeded already.
+                dependencies = [
+                    d for d in request.get("dependsOn", []) if d in retry_ids
+                ]
+                if dependencies:
+                    request["dependsOn"] = dependencies
+                else:
+                    request.pop("dependsOn", None)
+                retry_requests[request_id] = request
+            responses.update(self._execute(retry_requests))
+            attempt += 1
+
+    @staticmethod
+    def _failed_dependents(
+        requests: Dict[str, dict], responses: Dict[str, dict], failed_ids: set
+    ) -> set:
+        """Returns the ids of the requests that got a ``424`` because of
+        the failed requests, directly or through other dependents.
+        """
+        dependents: set = set()
+        while True:
+            found = {
+                request_id
+                for request_id, request in requests.items()
+                if request_id not in dependents
+                and responses.get(request_id, {}).get("status") == 424
+                and (failed_ids | dependents).intersection(request.get("dependsOn", []))
+            }
+            if not found:
+                return dependents
+            dependents |= found
+
+    def _execute(self, requests: Dict[str, dict]) -> Dict[str, dict]:
+        """Sends the requests in chunks and returns the responses by id."""
+        responses: Dict[str, dict] = {}
+        ordered = self._ordered_requests(requests)
+        for start in range(0, len(ordered), self.max_size):
+            chunk = []
+            for request in ordered[start : start + self.max_size]:
+                dependencies = request.get("dependsOn", [])
+                failed = [
+                    d
+                    for d in dependencies
+                    if d in responses and responses[d]["status"] >= 400
+                ]
+                if failed:
+                    responses[request["id"]] = self._failed_dependency_response(
+                        request["id"], failed
+                    )
+                    continue
+                # Dependencies sent in a previous call are already resolved.
+                request = dict(request)
+                dependencies = [d for d in dependencies if d not in responses]
+                if dependencies:
+                    request["dependsOn"] = dependencies
+                else:
+                    request.pop("dependsOn", None)
+                chunk.append(request)
+            if chunk:
+                responses.update(self._send(chunk))
+        return responses
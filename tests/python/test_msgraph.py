@@ -1,3 +1,10 @@
+import asyncio
+import hashlib
+import io
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from json.encoder import JSONEncoder
 import time
 from typing import Union
@@ -5,7 +12,19 @@ from urllib.parse import parse_qs, urlencode, urlparse
 from mock import MagicMock, ANY
 import pytest
 from pytest_mock import MockerFixture
-from RPA.MSGraph import MSGraph, DEFAULT_REDIRECT_URI
+from requests.exceptions import HTTPError
+from RPA.MSGraph import (
+    AsyncMSGraph,
+    GraphBatch,
+    GraphRequestScheduler,
+    MSGraph,
+    QuickXorHash,
+    MemoryTokenBackend,
+    MSGraphDownloadError,
+    RobocorpVaultTokenBackend,
+    DEFAULT_REDIRECT_URI,
+)
+from O365 import Account
 from O365.sharepoint import Site
 from pathlib import Path
 import re
@@ -113,6 +132,39 @@ def _patch_multiple_graph_responses(
     return mocker.patch.object(library.client.connection.session, "request", **config)
 
 
+def _create_graph_download_response(content: bytes) -> MagicMock:
+    mocked_response = MagicMock()
+    mocked_response.__enter__.return_value.status_code = 200
+    mocked_response.__enter__.return_value.headers = {
+        "Content-Type": "application/octet-stream"
+    }
+    mocked_response.__enter__.return_value.content = content
+    mocked_response.__enter__.return_value.iter_content.side_effect = (
+        lambda chunk_size: (
+            content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
+        )
+    )
+    return mocked_response
+
+
+def _patch_routed_graph_responses(
+    library: MSGraph, mocker: MockerFixture, routes: dict
+) -> MagicMock:
+    """Answers each request with the response of the first route whose
+    key is found in the URL, so concurrent requests can be mocked.
+    """
+
+    def respond(method: str, url: str, **kwargs) -> MagicMock:
+        for key, response in routes.items():
+            if key in url:
+                return response
+        raise AssertionError(f"Unexpected request: {method} {url}")
+
+    config = {"side_effect": respond}
+
+    return mocker.patch.object(library.client.connection.session, "request", **config)
+
+
 def test_configuring_graph_client(library: MSGraph, mocker: MockerFixture) -> None:
     mock_client = mocker.patch("RPA.MSGraph.Account", autospec=True)
 
@@ -121,6 +173,96 @@ def test_configuring_graph_client(library: MSGraph, mocker: MockerFixture) -> No
     mock_client.assert_any_call((MOCK_CLIENT_ID, MOCK_CLIENT_SECRET), token_backend=ANY)
 
 
+def test_app_only_tokens_are_cached_per_tenant(mocker: MockerFixture) -> None:
+    session = mocker.patch("O365.connection.OAuth2Session")
+    session.return_value.fetch_token.side_effect = lambda **kwargs: {
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() + 3600,
+        "access_token": MOCK_ACCESS_TOKEN.format(session.call_count),
+    }
+    account = mocker.patch("RPA.MSGraph.Account", wraps=Account)
+
+    def create_library(tenant_id: str) -> MSGraph:
+        return MSGraph(
+            MOCK_CLIENT_ID,
+            MOCK_CLIENT_SECRET,
+            file_backend_path=TEMP_DIR,
+            tenant_id=tenant_id,
+            app_only=True,
+        )
+
+    first = create_library("app-only-tenant-a")
+    second = create_library("app-only-tenant-a")
+    other_tenant = create_library("app-only-tenant-b")
+
+    assert session.return_value.fetch_token.call_count == 2
+    fetch_kwargs = session.return_value.fetch_token.call_args.kwargs
+    assert fetch_kwargs["scope"] == ["https://graph.microsoft.com/.default"]
+    assert "app-only-tenant-b" in fetch_kwargs["token_url"]
+    assert first.client.is_authenticated
+    assert second.client.con.token_backend.token == first.token_backend.token
+    assert other_tenant.token_backend.token != first.token_backend.token
+    account.assert_any_call(
+        (MOCK_CLIENT_ID, MOCK_CLIENT_SECRET),
+        token_backend=ANY,
+        auth_flow_type="credentials",
+        tenant_id="app-only-tenant-a",
+    )
+
+
+def test_expired_app_only_token_is_renewed(mocker: MockerFixture) -> None:
+    session = mocker.patch("O365.connection.OAuth2Session")
+    session.return_value.fetch_token.side_effect = lambda **kwargs: {
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() + 3600,
+        "access_token": MOCK_ACCESS_TOKEN.format(
+            session.return_value.fetch_token.call_count
+        ),
+    }
+    session.return_value.request.return_value = _create_graph_json_response(
+        {"value": [{"id": "app-user-id", "displayName": "Adele Vance"}]}
+    )
+    library = MSGraph(
+        MOCK_CLIENT_ID,
+        MOCK_CLIENT_SECRET,
+        file_backend_path=TEMP_DIR,
+        tenant_id="app-only-tenant-renew",
+        app_only=True,
+        token_refresh_margin=0,
+    )
+    library.token_backend.token = {
+        **library.token_backend.token,
+        "expires_at": time.time() + 30,
+    }
+
+    users = list(library.search_for_users("Adele"))
+
+    assert users[0].object_id == "app-user-id"
+    assert session.return_value.fetch_token.call_count == 2
+    assert library.token_backend.token["access_token"] == (MOCK_ACCESS_TOKEN.format(2))
+
+
+def test_sessions_share_configured_connection_pool() -> None:
+    library = MSGraph(
+        MOCK_CLIENT_ID,
+        MOCK_CLIENT_SECRET,
+        file_backend_path=TEMP_DIR,
+        pool_size=4,
+        keep_alive=False,
+    )
+
+    session = library.client.con.get_session()
+    naive_session = library.client.con.get_naive_session()
+
+    for adapter_session in (session, naive_session):
+        adapter = adapter_session.get_adapter("https://graph.microsoft.com")
+        assert adapter._pool_maxsize == 4
+        assert adapter_session.headers["Connection"] == "close"
+    assert library.client.con.requests_delay == 0
+
+
 def test_generating_auth_url(init_auth: str) -> None:
     params = {
         "response_type": "code",
@@ -176,6 +318,473 @@ def test_refreshing_token(configured_lib: MSGraph, mocker: MockerFixture) -> Non
     assert refresh_token == MOCK_REFRESH_TOKEN.format(2)
 
 
+def _patch_token_refresh(library: MSGraph, mocker: MockerFixture) -> MagicMock:
+    token = library.client.con.token_backend.token
+    refreshed = threading.Event()
+
+    def refresh_token() -> bool:
+        time.sleep(0.1)
+        token["expires_at"] = time.time() + 3600
+        refreshed.set()
+        return True
+
+    refresh = mocker.patch.object(
+        library.client.con, "refresh_token", side_effect=refresh_token
+    )
+    refresh.refreshed = refreshed
+    return refresh
+
+
+def test_token_is_refreshed_ahead_of_expiry(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    authorized_lib.client.con.token_backend.token["expires_at"] = time.time() + 120
+    refresh = _patch_token_refresh(authorized_lib, mocker)
+    _patch_graph_response(
+        authorized_lib, mocker, {"id": "user-id", "displayName": "Adele Vance"}
+    )
+
+    user_me = authorized_lib.get_me()
+
+    assert user_me.object_id == "user-id"
+    assert refresh.refreshed.wait(5)
+    authorized_lib.client.con.token_refresher.stop()
+    assert refresh.call_count == 1
+
+
+def test_expired_token_is_refreshed_once(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    authorized_lib.client.con.token_backend.token["expires_at"] = time.time() - 1
+    refresh = _patch_token_refresh(authorized_lib, mocker)
+    _patch_graph_response(
+        authorized_lib, mocker, {"id": "user-id", "displayName": "Adele Vance"}
+    )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        users = list(executor.map(lambda _: authorized_lib.get_me(), range(4)))
+
+    authorized_lib.client.con.token_refresher.stop()
+    assert [user.object_id for user in users] == ["user-id"] * 4
+    assert refresh.call_count == 1
+
+
+def test_token_refresher_starts_one_thread(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    refresher = authorized_lib.client.con.token_refresher
+    refresher.stop()
+    if refresher._thread:
+        refresher._thread.join(5)
+    released = threading.Event()
+    runs = []
+
+    def run() -> None:
+        runs.append(threading.current_thread())
+        released.wait(5)
+
+    mocker.patch.object(refresher, "_run", side_effect=run)
+    barrier = threading.Barrier(8)
+
+    def start(_) -> None:
+        barrier.wait()
+        refresher.start()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(start, range(8)))
+    released.set()
+    refresher._thread.join(5)
+
+    assert len(runs) == 1
+
+
+def test_token_refresher_is_not_started_without_refresh_token(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    refresher = authorized_lib.client.con.token_refresher
+    refresher.stop()
+    if refresher._thread:
+        refresher._thread.join(5)
+    refresher._thread = None
+    del authorized_lib.client.con.token_backend.token["refresh_token"]
+    _patch_graph_response(
+        authorized_lib, mocker, {"id": "user-id", "displayName": "Adele Vance"}
+    )
+
+    for _ in range(5):
+        authorized_lib.get_me()
+
+    assert refresher._thread is None
+
+
+def test_token_refresh_margin_longer_than_token_lifetime(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    refresher = authorized_lib.client.con.token_refresher
+    refresher.stop()
+    if refresher._thread:
+        refresher._thread.join(5)
+    refresher.margin = 3600
+    authorized_lib.client.con.token_backend.token["expires_at"] = time.time() + 3599
+    refresh = _patch_token_refresh(authorized_lib, mocker)
+
+    refresher.start()
+    time.sleep(0.2)
+    refresher.stop()
+
+    assert refresh.call_count == 0
+
+
+class FakeVault:
+    def __init__(self) -> None:
+        self.secret = {"token": ""}
+
+    def get_secret(self, secret_name: str) -> dict:
+        assert secret_name == "msgraph"
+        return dict(self.secret)
+
+    def set_secret(self, secret: dict) -> None:
+        self.secret = dict(secret)
+
+
+def test_vault_token_backend_is_shared_in_memory(mocker: MockerFixture) -> None:
+    vault = FakeVault()
+
+    def create_library() -> MSGraph:
+        return MSGraph(
+            token_backend=MemoryTokenBackend(
+                "test-vault", RobocorpVaultTokenBackend("msgraph", vault=vault)
+            )
+        )
+
+    library = create_library()
+    init_auth = library.generate_oauth_authorization_url(
+        MOCK_CLIENT_ID, MOCK_CLIENT_SECRET
+    )
+    _patch_token_response(library, mocker, 1)
+
+    refresh_token = library.authorize_and_get_token(
+        _get_stateful_mock_auth_code(init_auth)
+    )
+    library.token_backend.flush()
+
+    assert refresh_token is None
+    assert json.loads(vault.secret["token"])["access_token"] == (
+        MOCK_ACCESS_TOKEN.format(1)
+    )
+    other_library = create_library()
+    assert other_library.token_backend.token["access_token"] == (
+        MOCK_ACCESS_TOKEN.format(1)
+    )
+    other_library.token_backend.delete_token()
+    assert library.token_backend.token is None
+    assert vault.secret["token"] == ""
+
+
+def test_shared_memory_token_reaches_other_sessions(mocker: MockerFixture) -> None:
+    first = MSGraph(token_backend=MemoryTokenBackend("test-shared-session"))
+    init_auth = first.generate_oauth_authorization_url(
+        MOCK_CLIENT_ID, MOCK_CLIENT_SECRET
+    )
+    _patch_token_response(first, mocker, 1)
+    first.authorize_and_get_token(_get_stateful_mock_auth_code(init_auth))
+    second = MSGraph(
+        MOCK_CLIENT_ID,
+        MOCK_CLIENT_SECRET,
+        token_backend=MemoryTokenBackend("test-shared-session"),
+        token_refresh_margin=0,
+    )
+    second.client.con.session = second.client.con.get_session(load_token=True)
+    _patch_graph_response(
+        second, mocker, {"id": "user-id", "displayName": "Adele Vance"}
+    )
+    second.get_me()
+
+    first.token_backend.token = {
+        **first.token_backend.token,
+        "access_token": MOCK_ACCESS_TOKEN.format(2),
+        "expires_at": time.time() + 7200,
+    }
+    second.get_me()
+
+    assert second.client.con.session.token["access_token"] == (
+        MOCK_ACCESS_TOKEN.format(2)
+    )
+
+
+def test_shared_token_file_is_refreshed_once(mocker: MockerFixture) -> None:
+    token_dir = TEMP_DIR / "shared-token"
+    shutil.rmtree(token_dir, ignore_errors=True)
+    workers = [
+        MSGraph(
+            MOCK_CLIENT_ID,
+            MOCK_CLIENT_SECRET,
+            file_backend_path=token_dir,
+            shared_token_file=True,
+        )
+        for _ in range(2)
+    ]
+    workers[0].token_backend.token = {
+        "token_type": "Bearer",
+        "access_token": MOCK_ACCESS_TOKEN.format(1),
+        "refresh_token": MOCK_REFRESH_TOKEN.format(1),
+        "expires_at": time.time() - 1,
+    }
+    workers[0].token_backend.save_token()
+    workers[1].token_backend.get_token()
+    refreshes = []
+
+    def patch_refresh(worker: MSGraph) -> None:
+        def refresh_token() -> bool:
+            refreshes.append(worker)
+            time.sleep(0.1)
+            worker.token_backend.token = {
+                "token_type": "Bearer",
+                "access_token": MOCK_ACCESS_TOKEN.format(2),
+                "refresh_token": MOCK_REFRESH_TOKEN.format(2),
+                "expires_at": time.time() + 3600,
+            }
+            return worker.token_backend.save_token()
+
+        mocker.patch.object(
+            worker.client.con, "refresh_token", side_effect=refresh_token
+        )
+
+    for worker in workers:
+        patch_refresh(worker)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        refresh_tokens = list(executor.map(MSGraph.refresh_oauth_token, workers))
+
+    assert len(refreshes) == 1
+    assert refresh_tokens == [MOCK_REFRESH_TOKEN.format(2)] * 2
+    for worker in workers:
+        assert worker.token_backend.token["access_token"] == (
+            MOCK_ACCESS_TOKEN.format(2)
+        )
+
+
+def test_batch_ids_skip_explicit_ids() -> None:
+    batch = GraphBatch(MagicMock(), "https://graph.microsoft.com/v1.0")
+
+    ids = [
+        batch.add("GET", "/me", request_id="2"),
+        batch.add("GET", "/me/drive"),
+        batch.add("GET", "/me/events"),
+    ]
+
+    assert ids == ["2", "3", "4"]
+    with pytest.raises(ValueError):
+        batch.add("GET", "/me", request_id="2")
+
+
+def test_run_graph_batch(authorized_lib: MSGraph, mocker: MockerFixture) -> None:
+    requests = [
+        {"method": "GET", "url": "/me/drive/root:/Report.pdf", "id": "file"},
+        {"method": "get", "url": "https://graph.microsoft.com/v1.0/me"},
+        {
+            "method": "POST",
+            "url": "/me/drive/items/123/copy",
+            "body": {"name": "Copy.pdf"},
+            "dependsOn": ["file"],
+        },
+    ]
+    response = {
+        "responses": [
+            {"id": "2", "status": 200, "headers": {}, "body": {"id": "me"}},
+            {"id": "3", "status": 202, "headers": {}, "body": {}},
+            {"id": "file", "status": 200, "headers": {}, "body": {"id": "123"}},
+        ]
+    }
+    m = _patch_graph_response(authorized_lib, mocker, response)
+
+    responses = authorized_lib.run_graph_batch(requests)
+
+    m.assert_called_once()
+    assert m.call_args.args[1].endswith("/v1.0/$batch")
+    sent = json.loads(m.call_args.kwargs["data"])["requests"]
+    assert [r["url"] for r in sent] == [
+        "/me/drive/root:/Report.pdf",
+        "/me",
+        "/me/drive/items/123/copy",
+    ]
+    assert sent[1]["method"] == "GET"
+    assert sent[2]["dependsOn"] == ["file"]
+    assert sent[2]["headers"]["Content-Type"] == "application/json"
+    assert [r["id"] for r in responses] == ["file", "2", "3"]
+
+
+def test_run_graph_batch_resends_throttled_requests(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    requests = [
+        {"method": "GET", "url": "/me/drive/root:/Report.pdf", "id": "file"},
+        {"method": "GET", "url": "/me"},
+        {
+            "method": "POST",
+            "url": "/me/drive/items/123/copy",
+            "body": {"name": "Copy.pdf"},
+            "dependsOn": ["file"],
+        },
+    ]
+    first = {
+        "responses": [
+            {"id": "file", "status": 429, "headers": {"Retry-After": "0"}},
+            {"id": "2", "status": 200, "headers": {}, "body": {"id": "me"}},
+            {"id": "3", "status": 424, "headers": {}},
+        ]
+    }
+    second = {
+        "responses": [
+            {"id": "file", "status": 200, "headers": {}, "body": {"id": "123"}},
+            {"id": "3", "status": 202, "headers": {}},
+        ]
+    }
+    mocked_responses = [_create_graph_json_response(r) for r in (first, second)]
+    m = _patch_multiple_graph_responses(authorized_lib, mocker, mocked_responses)
+    mocker.patch("RPA.MSGraph.time.sleep")
+
+    responses = authorized_lib.run_graph_batch(requests)
+
+    assert m.call_count == 2
+    resent = json.loads(m.call_args.kwargs["data"])["requests"]
+    assert [r["id"] for r in resent] == ["file", "3"]
+    assert resent[1]["dependsOn"] == ["file"]
+    assert [r["status"] for r in responses] == [200, 200, 202]
+
+
+def test_run_graph_batch_chunks_and_dependencies(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    requests = [{"method": "GET", "url": f"/me/drive/items/{i}"} for i in range(25)]
+    requests.insert(0, {"method": "GET", "url": "/me", "dependsOn": ["3"]})
+    first = {
+        "responses": [
+            {"id": str(i), "status": 404 if i == 3 else 200, "headers": {}}
+            for i in range(2, 22)
+        ]
+    }
+    second = {
+        "responses": [
+            {"id": str(i), "status": 200, "headers": {}} for i in range(22, 27)
+        ]
+    }
+    mocked_responses = [_create_graph_json_response(r) for r in (first, second)]
+    m = _patch_multiple_graph_responses(authorized_lib, mocker, mocked_responses)
+
+    responses = authorized_lib.run_graph_batch(requests)
+
+    assert m.call_count == 2
+    sent = [json.loads(c.kwargs["data"])["requests"] for c in m.call_args_list]
+    assert len(sent[0]) == 20
+    assert "1" not in [r["id"] for r in sent[0] + sent[1]]
+    assert responses[0]["status"] == 424
+    assert len(responses) == 26
+
+
+def test_throttled_requests_are_retried(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    throttled = MagicMock()
+    throttled.status_code = 429
+    throttled.headers = {"Retry-After": "0"}
+    throttled.raise_for_status.side_effect = HTTPError(
+        "429 Too Many Requests", response=throttled
+    )
+    unavailable = MagicMock()
+    unavailable.status_code = 503
+    unavailable.headers = {}
+    unavailable.raise_for_status.side_effect = HTTPError(
+        "503 Service Unavailable", response=unavailable
+    )
+    user = {"id": "user-id", "displayName": "Adele Vance"}
+    mocker.patch("RPA.MSGraph.time.sleep")
+    before = authorized_lib.get_graph_request_statistics()
+    request = _patch_multiple_graph_responses(
+        authorized_lib,
+        mocker,
+        [throttled, unavailable, _create_graph_json_response(user)],
+    )
+
+    user_me = authorized_lib.get_me()
+
+    after = authorized_lib.get_graph_request_statistics()
+    assert user_me.object_id == "user-id"
+    assert request.call_count == 3
+    assert after["retried"] - before["retried"] == 2
+    assert after["throttled"] - before["throttled"] == 2
+    assert after["requests"] - before["requests"] == 3
+
+
+def test_post_requests_are_not_retried_on_server_errors(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    bad_gateway = MagicMock()
+    bad_gateway.status_code = 502
+    bad_gateway.headers = {}
+    bad_gateway.raise_for_status.side_effect = HTTPError(
+        "502 Bad Gateway", response=bad_gateway
+    )
+    mocker.patch("RPA.MSGraph.time.sleep")
+    request = _patch_multiple_graph_responses(
+        authorized_lib,
+        mocker,
+        [bad_gateway, _create_graph_json_response({"responses": []})],
+    )
+
+    with pytest.raises(HTTPError, match="502"):
+        authorized_lib.run_graph_batch([{"method": "GET", "url": "/me"}])
+
+    assert request.call_count == 1
+    assert request.call_args.args[0] == "post"
+
+
+def test_scheduler_allows_rates_below_one_per_second(
+    mocker: MockerFixture,
+) -> None:
+    now = [100.0]
+    mocker.patch("RPA.MSGraph.time.monotonic", side_effect=lambda: now[0])
+    scheduler = GraphRequestScheduler(requests_per_second=0.5)
+
+    assert scheduler._next_wait() == 0.0
+    assert scheduler._next_wait() == pytest.approx(2.0)
+    now[0] += 2.0
+    assert scheduler._next_wait() == 0.0
+    assert scheduler.statistics()["requests"] == 2
+
+
+def test_async_interface_gathers_calls(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    user_ids = ["adele", "alex", "megan"]
+    routes = {}
+    for user_id in user_ids:
+        routes[f"{user_id}-root/children"] = _create_graph_json_response(
+            {"value": [{"id": f"{user_id}-file", "name": f"{user_id}.txt", "file": {}}]}
+        )
+        routes[f"users/{user_id}/drive/root"] = _create_graph_json_response(
+            {"id": f"{user_id}-root", "name": "root", "root": {}, "folder": {}}
+        )
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    async def list_user_files() -> list:
+        async with AsyncMSGraph(authorized_lib, max_concurrency=2) as graph:
+            return await asyncio.gather(
+                *(
+                    graph.list_files_in_onedrive_folder(resource=f"users/{user_id}")
+                    for user_id in user_ids
+                )
+            )
+
+    results = asyncio.run(list_user_files())
+
+    assert [[item.name for item in files] for files in results] == [
+        ["adele.txt"],
+        ["alex.txt"],
+        ["megan.txt"],
+    ]
+
+
 def test_get_me(authorized_lib: MSGraph, mocker: MockerFixture) -> None:
     data = {
         "businessPhones": ["+1 425 555 0109"],
@@ -280,6 +889,8 @@ def test_search_for_users(
     users = authorized_lib.search_for_users(search_string)
 
     m.assert_called_once()
+    assert m.call_args.kwargs["headers"]["ConsistencyLevel"] == "eventual"
+    assert "ConsistencyLevel" not in authorized_lib.client.con.session.headers
     for user in users:
         assert user.display_name in [u["displayName"] for u in response["value"]]
         assert user.user_principal_name in [
@@ -348,6 +959,94 @@ def test_listing_files_onedrive_folder(
         assert not item.is_folder
 
 
+def test_streaming_files_in_onedrive_folder(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    folder = {"id": "folder-id", "name": "Reports", "folder": {"childCount": 4}}
+    first_page = {
+        "value": [
+            {"id": "1", "name": "a.pdf", "file": {}},
+            {"id": "2", "name": "Archive", "folder": {"childCount": 0}},
+        ],
+        "@odata.nextLink": "https://graph.microsoft.com/v1.0/next-page",
+    }
+    second_page = {
+        "value": [
+            {"id": "3", "name": "b.pdf", "file": {}},
+            {"id": "4", "name": "c.pdf", "file": {}},
+        ],
+    }
+    request = _patch_multiple_graph_responses(
+        authorized_lib,
+        mocker,
+        [_create_graph_json_response(r) for r in [folder, first_page, second_page]],
+    )
+
+    items = authorized_lib.list_files_in_onedrive_folder(
+        "/Reports", stream=True, page_size=2
+    )
+    assert request.call_count == 1
+    assert next(items).name == "a.pdf"
+    assert [item.name for item in items] == ["b.pdf", "c.pdf"]
+
+    assert request.call_args_list[1].kwargs["params"] == {"$top": 2}
+    assert request.call_args_list[2].args[1].endswith("/next-page")
+
+
+def test_listing_files_with_selected_fields(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    folder = {"id": "folder-id", "name": "Reports", "folder": {"childCount": 2}}
+    children = {
+        "value": [
+            {"id": "1", "name": "a.pdf", "size": 10},
+            {"id": "2", "name": "Archive", "size": 0, "folder": {"childCount": 0}},
+        ]
+    }
+    found = {"value": [{"id": "1", "name": "a.pdf", "size": 10}]}
+    request = _patch_multiple_graph_responses(
+        authorized_lib,
+        mocker,
+        [_create_graph_json_response(r) for r in [folder, children, found]],
+    )
+
+    items = authorized_lib.list_files_in_onedrive_folder(
+        "/Reports", fields="name, size"
+    )
+    found_items = authorized_lib.find_onedrive_file("a.pdf", fields=["id"])
+
+    assert items == [{"name": "a.pdf", "size": 10}]
+    assert found_items == [{"id": "1"}]
+    assert request.call_args_list[1].kwargs["params"]["$select"] == "name,size,folder"
+    assert request.call_args_list[2].args[1].endswith("/drive/search(q='a.pdf')")
+    assert request.call_args_list[2].kwargs["params"]["$select"] == "id,folder"
+
+
+def test_folder_lookups_are_cached(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    folder = {"id": "folder-id", "name": "Reports", "folder": {"childCount": 1}}
+    children = {"value": [{"id": "file-id", "name": "report.pdf", "file": {}}]}
+    mocked_responses = [
+        _create_graph_json_response(folder),
+        _create_graph_json_response(children),
+        _create_graph_json_response(children),
+        _create_graph_json_response(folder),
+        _create_graph_json_response(children),
+    ]
+    request = _patch_multiple_graph_responses(authorized_lib, mocker, mocked_responses)
+
+    authorized_lib.list_files_in_onedrive_folder("/Reports")
+    authorized_lib.list_files_in_onedrive_folder("Reports/")
+    assert request.call_count == 3
+
+    authorized_lib.clear_msgraph_cache()
+    items = authorized_lib.list_files_in_onedrive_folder("/Reports")
+
+    assert request.call_count == 5
+    assert [item.name for item in items] == ["report.pdf"]
+
+
 @pytest.mark.parametrize(
     "file_path,responses",
     [
@@ -457,6 +1156,349 @@ def test_downloading_folder_from_onedrive(
     assert downloaded_folder.exists()
 
 
+def test_downloading_folder_raises_on_failed_files(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    to_path = TEMP_DIR / "partial"
+    shutil.rmtree(to_path, ignore_errors=True)
+    children = [
+        {"id": "f1", "name": "a.txt", "size": 5, "file": {}},
+        {"id": "f2", "name": "b.txt", "size": 6, "file": {}},
+    ]
+    failing = MagicMock()
+    failing.__enter__.side_effect = HTTPError("404 Not Found")
+    routes = {
+        "root:/Partial": _create_graph_json_response(
+            {"id": "partial", "name": "Partial", "folder": {"childCount": 2}}
+        ),
+        "/items/partial/children": _create_graph_json_response({"value": children}),
+        "/items/f1/content": _create_graph_download_response(b"aaaaa"),
+        "/items/f2/content": failing,
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    with pytest.raises(MSGraphDownloadError, match=r"1 files failed: b\.txt"):
+        authorized_lib.download_folder_from_onedrive("/Partial", to_path)
+
+    assert (to_path / "a.txt").read_bytes() == b"aaaaa"
+
+
+def test_resuming_download_from_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    content = b"0123456789abcdefghij"
+    item = {"id": "big-id", "name": "big.bin", "size": len(content), "file": {}}
+    part_file = TEMP_DIR / "big.bin.part"
+    state_file = TEMP_DIR / "big.bin.download-state.json"
+    part_file.write_bytes(content[:8] + b"garbage")
+    state_file.write_text(json.dumps({"etag": '"v1"', "offset": 8}))
+    routes = {
+        "root:/big.bin": _create_graph_json_response(item),
+        "/items/big-id": _create_graph_json_response(
+            {
+                **item,
+                "eTag": '"v1"',
+                "@microsoft.graph.downloadUrl": "https://download.example.com/big",
+            }
+        ),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    remaining = _create_graph_download_response(content[8:])
+    remaining.__enter__.return_value.status_code = 206
+    naive_session = MagicMock()
+    naive_session.request.return_value = remaining
+    authorized_lib.client.con.naive_session = naive_session
+
+    downloaded_file = authorized_lib.download_file_from_onedrive(
+        "/big.bin", TEMP_DIR, resumable=True
+    )
+
+    assert naive_session.request.call_args.kwargs["headers"] == {"Range": "bytes=8-"}
+    assert downloaded_file.read_bytes() == content
+    assert not part_file.exists()
+    assert not state_file.exists()
+
+
+def test_resuming_completed_download_from_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    content = b"0123456789abcdefghij"
+    item = {"id": "done-id", "name": "done.bin", "size": len(content), "file": {}}
+    part_file = TEMP_DIR / "done.bin.part"
+    state_file = TEMP_DIR / "done.bin.download-state.json"
+    part_file.write_bytes(content)
+    state_file.write_text(json.dumps({"etag": '"v1"', "offset": len(content)}))
+    routes = {
+        "root:/done.bin": _create_graph_json_response(item),
+        "/items/done-id": _create_graph_json_response(
+            {
+                **item,
+                "eTag": '"v1"',
+                "@microsoft.graph.downloadUrl": "https://download.example.com/done",
+            }
+        ),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    naive_session = MagicMock()
+    authorized_lib.client.con.naive_session = naive_session
+
+    downloaded_file = authorized_lib.download_file_from_onedrive(
+        "/done.bin", TEMP_DIR, resumable=True
+    )
+
+    naive_session.request.assert_not_called()
+    assert downloaded_file.read_bytes() == content
+    assert not part_file.exists()
+    assert not state_file.exists()
+
+
+def test_streaming_file_from_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    routes = {
+        "root:/data.csv": _create_graph_json_response(
+            {"id": "f1", "name": "data.csv", "size": 10, "file": {}}
+        ),
+        "/items/f1/content": _create_graph_download_response(b"a,b\n1,2\n3,4\n"),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    buffer = io.BytesIO()
+
+    chunks = authorized_lib.stream_file_from_onedrive("/data.csv", chunk_size=4)
+    written = authorized_lib.stream_file_from_onedrive(
+        "/data.csv", to_stream=buffer, chunk_size=4
+    )
+
+    assert list(chunks) == [b"a,b\n", b"1,2\n", b"3,4\n"]
+    assert written == 12
+    assert buffer.getvalue() == b"a,b\n1,2\n3,4\n"
+
+
+def test_downloading_files_from_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    to_path = TEMP_DIR / "downloaded_files"
+    to_path.mkdir(parents=True, exist_ok=True)
+    routes = {
+        "/items/id-1/content": _create_graph_download_response(b"first file"),
+        "/items/id-2/content": _create_graph_download_response(b"second"),
+        "root:/Invoices/1.pdf": _create_graph_json_response(
+            {"id": "id-1", "name": "1.pdf", "size": 10}
+        ),
+        "root:/Invoices/2.pdf": _create_graph_json_response(
+            {"id": "id-2", "name": "2.pdf", "size": 6}
+        ),
+        "root:/Invoices/missing.pdf": _create_graph_json_response({"folder": {}}),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    results = authorized_lib.download_files_from_onedrive(
+        ["/Invoices/1.pdf", "/Invoices/missing.pdf", "/Invoices/2.pdf"],
+        to_path,
+        max_workers=3,
+    )
+
+    assert [r["source"] for r in results] == [
+        "/Invoices/1.pdf",
+        "/Invoices/missing.pdf",
+        "/Invoices/2.pdf",
+    ]
+    assert results[0]["path"] == to_path / "1.pdf"
+    assert results[0]["size"] == len(b"first file")
+    assert results[1]["path"] is None
+    assert results[1]["error"]
+    assert results[2]["size"] == len(b"second")
+    assert results[2]["error"] is None
+
+
+def test_downloading_files_with_same_name(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    to_path = TEMP_DIR / "downloaded_files"
+    to_path.mkdir(parents=True, exist_ok=True)
+    routes = {
+        "/items/id-a/content": _create_graph_download_response(b"from a"),
+        "root:/a/report.pdf": _create_graph_json_response(
+            {"id": "id-a", "name": "report.pdf", "size": 6}
+        ),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    results = authorized_lib.download_files_from_onedrive(
+        ["/a/report.pdf", "/b/Report.pdf"], to_path
+    )
+
+    assert results[0]["path"] == to_path / "report.pdf"
+    assert results[0]["error"] is None
+    assert results[1]["path"] is None
+    assert "already downloaded" in results[1]["error"]
+    assert (to_path / "report.pdf").read_bytes() == b"from a"
+
+
+def test_downloading_folder_tree_manifest(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    to_path = TEMP_DIR / "downloaded_tree"
+    routes = {
+        "root:/Archive": _create_graph_json_response(
+            {"id": "archive", "name": "Archive", "folder": {"childCount": 3}}
+        ),
+        "/items/archive/children": _create_graph_json_response(
+            {
+                "value": [
+                    {"id": "f1", "name": "a.txt", "size": 5, "file": {}},
+                    {"id": "sub", "name": "Sub", "folder": {"childCount": 1}},
+                    {"id": "empty", "name": "Empty", "folder": {"childCount": 0}},
+                ]
+            }
+        ),
+        "/items/sub/children": _create_graph_json_response(
+            {"value": [{"id": "f2", "name": "b.txt", "size": 6, "file": {}}]}
+        ),
+        "/items/f1/content": _create_graph_download_response(b"aaaaa"),
+        "/items/f2/content": _create_graph_download_response(b"bbbbbb"),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    manifest = authorized_lib.download_folder_from_onedrive(
+        "/Archive", to_path, return_manifest=True
+    )
+
+    assert sorted(m["source"] for m in manifest) == ["Sub/b.txt", "a.txt"]
+    assert all(m["error"] is None for m in manifest)
+    assert sum(m["size"] for m in manifest) == 11
+    assert (to_path / "Sub" / "b.txt").read_bytes() == b"bbbbbb"
+    assert (to_path / "Empty").is_dir()
+
+
+def test_mirroring_folder_from_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    to_path = TEMP_DIR / "mirrored"
+    shutil.rmtree(to_path, ignore_errors=True)
+    to_path.with_name("mirrored.mirror-index.json").unlink(missing_ok=True)
+    (to_path / "Gone").mkdir(parents=True)
+    (to_path / "Gone" / "x.txt").write_bytes(b"x")
+    (to_path / "b.txt").write_bytes(b"bbbbbb")
+    quick_xor = QuickXorHash()
+    quick_xor.update(b"aaaaa")
+    children = [
+        {
+            "id": "f1",
+            "name": "a.txt",
+            "size": 5,
+            "file": {"hashes": {"quickXorHash": quick_xor.base64digest()}},
+        },
+        {
+            "id": "f2",
+            "name": "b.txt",
+            "size": 6,
+            "file": {"hashes": {"sha1Hash": hashlib.sha1(b"bbbbbb").hexdigest()}},
+        },
+    ]
+    routes = {
+        "root:/Mirror": _create_graph_json_response(
+            {"id": "mirror", "name": "Mirror", "folder": {"childCount": 2}}
+        ),
+        "/items/mirror/children": _create_graph_json_response({"value": children}),
+        "/items/f1/content": _create_graph_download_response(b"aaaaa"),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    first = authorized_lib.download_folder_from_onedrive(
+        "/Mirror", to_path, return_manifest=True, mirror=True, delete_orphans=True
+    )
+    second = authorized_lib.download_folder_from_onedrive(
+        "/Mirror", to_path, return_manifest=True, mirror=True
+    )
+
+    assert sorted((m["source"], m["action"]) for m in first) == [
+        ("Gone", "deleted"),
+        ("Gone/x.txt", "deleted"),
+        ("a.txt", "downloaded"),
+        ("b.txt", "skipped"),
+    ]
+    assert [m["action"] for m in second] == ["skipped", "skipped"]
+    assert sorted(p.name for p in to_path.iterdir()) == ["a.txt", "b.txt"]
+    downloads = [c for c in request.call_args_list if "/content" in c.args[1]]
+    assert len(downloads) == 1
+
+
+def test_syncing_drive_changes(authorized_lib: MSGraph, mocker: MockerFixture) -> None:
+    state_file = TEMP_DIR / "sync.delta.json"
+    to_folder = TEMP_DIR / "synced"
+    state_file.unlink(missing_ok=True)
+    shutil.rmtree(to_folder, ignore_errors=True)
+    root = {"id": "root-id", "name": "root", "root": {}, "folder": {}}
+    routes = {
+        "token=second": _create_graph_json_response(
+            {
+                "value": [
+                    {
+                        "id": "docs",
+                        "name": "Papers",
+                        "folder": {},
+                        "parentReference": {"id": "root-id"},
+                    },
+                    {"id": "f2", "deleted": {}},
+                ],
+                "@odata.deltaLink": "https://graph.microsoft.com/v1.0/delta?token=third",
+            }
+        ),
+        "/items/root-id/delta": _create_graph_json_response(
+            {
+                "value": [
+                    root,
+                    {
+                        "id": "docs",
+                        "name": "Docs",
+                        "folder": {},
+                        "parentReference": {"id": "root-id"},
+                    },
+                    {
+                        "id": "f1",
+                        "name": "a.txt",
+                        "file": {},
+                        "size": 5,
+                        "parentReference": {"id": "docs"},
+                    },
+                    {
+                        "id": "f2",
+                        "name": "b.txt",
+                        "file": {},
+                        "size": 6,
+                        "parentReference": {"id": "root-id"},
+                    },
+                ],
+                "@odata.deltaLink": "https://graph.microsoft.com/v1.0/delta?token=second",
+            }
+        ),
+        "/items/f1/content": _create_graph_download_response(b"aaaaa"),
+        "/items/f2/content": _create_graph_download_response(b"bbbbbb"),
+        "/drive/root": _create_graph_json_response(root),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    first = authorized_lib.sync_drive_changes(state_file, to_folder=to_folder)
+    second = authorized_lib.sync_drive_changes(state_file, to_folder=to_folder)
+
+    assert [(c["change"], c["path"]) for c in first] == [
+        ("added", "Docs"),
+        ("added", "Docs/a.txt"),
+        ("added", "b.txt"),
+    ]
+    assert [(c["change"], c["path"], c["previous_path"]) for c in second] == [
+        ("modified", "Papers", "Docs"),
+        ("deleted", "b.txt", None),
+    ]
+    assert (to_folder / "Papers" / "a.txt").read_bytes() == b"aaaaa"
+    assert not (to_folder / "Docs").exists()
+    assert not (to_folder / "b.txt").exists()
+    state = json.loads(state_file.read_text())
+    assert state["delta_link"].endswith("token=third")
+    assert state["items"] == {"docs": "Papers", "f1": "Papers/a.txt"}
+
+
 @pytest.mark.parametrize(
     "search_string,response",
     [
@@ -600,6 +1642,116 @@ def test_uploading_file_to_onedrive(
     assert item.name == responses[1]["name"]
 
 
+def test_resuming_upload_session_to_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    chunk_size = 327680
+    upload_url = "https://contoso-my.sharepoint.com/upload/session-1"
+    TEMP_DIR.mkdir(exist_ok=True)
+    file_path = TEMP_DIR / "backup.bin"
+    file_path.write_bytes(b"x" * (chunk_size * 2 + 100))
+    state_file = TEMP_DIR / "backup.bin.upload-session.json"
+    stat = file_path.stat()
+    state_file.write_text(
+        json.dumps(
+            {
+                "upload_url": upload_url,
+                "target": "folder-id",
+                "size": stat.st_size,
+                "modified": stat.st_mtime,
+                "offset": chunk_size,
+            }
+        )
+    )
+    _patch_graph_response(
+        authorized_lib,
+        mocker,
+        {"id": "folder-id", "name": "Backups", "folder": {"childCount": 0}},
+    )
+    session_status = _create_graph_json_response(
+        {"nextExpectedRanges": [f"{chunk_size}-"]}
+    )
+    accepted = _create_graph_json_response(
+        {"nextExpectedRanges": [f"{chunk_size * 2}-"]}
+    )
+    accepted.status_code = 202
+    completed = _create_graph_json_response(
+        {"id": "file-id", "name": "backup.bin", "size": stat.st_size, "file": {}}
+    )
+    completed.status_code = 201
+    naive_session = MagicMock()
+    naive_session.request.side_effect = [session_status, accepted, completed]
+    authorized_lib.client.con.naive_session = naive_session
+
+    item = authorized_lib.upload_file_to_onedrive(
+        file_path, "/Backups", resumable=True, chunk_size=chunk_size
+    )
+
+    assert item.object_id == "file-id"
+    assert not state_file.exists()
+    ranges = [
+        c.kwargs["headers"]["Content-Range"]
+        for c in naive_session.request.call_args_list[1:]
+    ]
+    assert ranges == [
+        f"bytes {chunk_size}-{chunk_size * 2 - 1}/{stat.st_size}",
+        f"bytes {chunk_size * 2}-{stat.st_size - 1}/{stat.st_size}",
+    ]
+
+
+def test_upload_chunk_size_must_be_multiple_of_320_kib(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    _patch_graph_response(
+        authorized_lib, mocker, {"id": "folder-id", "name": "Backups", "folder": {}}
+    )
+
+    with pytest.raises(ValueError):
+        authorized_lib.upload_file_to_onedrive(
+            __file__, "/Backups", resumable=True, chunk_size=1000
+        )
+
+
+def test_uploading_files_to_onedrive(
+    authorized_lib: MSGraph, mocker: MockerFixture
+) -> None:
+    source = TEMP_DIR / "upload_source"
+    (source / "sub").mkdir(parents=True, exist_ok=True)
+    (source / "a.txt").write_text("first")
+    (source / "sub" / "b.txt").write_text("second")
+    (source / "sub" / "c.txt").write_text("third")
+    missing_folder = _create_graph_json_response({"error": {"code": "itemNotFound"}})
+    missing_folder.status_code = 404
+    missing_folder.raise_for_status.side_effect = HTTPError(response=missing_folder)
+    routes = {
+        "root:/Uploads": _create_graph_json_response(
+            {"id": "base", "name": "Uploads", "folder": {}}
+        ),
+        "/items/base:/sub": missing_folder,
+        "/items/base/children": _create_graph_json_response(
+            {"id": "sub", "name": "sub", "folder": {}}
+        ),
+        "/items/base:/a.txt:/content": _create_graph_json_response(
+            {"id": "a", "name": "a.txt"}
+        ),
+        "/items/sub:/b.txt:/content": _create_graph_json_response(
+            {"id": "b", "name": "b.txt"}
+        ),
+        "/items/sub:/c.txt:/content": _create_graph_json_response(
+            {"id": "c", "name": "c.txt"}
+        ),
+    }
+    m = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    results = authorized_lib.upload_files_to_onedrive(source, "/Uploads")
+
+    assert [r["target"] for r in results] == ["a.txt", "sub/b.txt", "sub/c.txt"]
+    assert [r["item"].object_id for r in results] == ["a", "b", "c"]
+    assert all(r["error"] is None for r in results)
+    folder_lookups = [c for c in m.call_args_list if "/items/base:/sub" in c.args[1]]
+    assert len(folder_lookups) == 1
+
+
 @pytest.mark.parametrize(
     "args",
     [
@@ -806,6 +1958,327 @@ def test_create_sharepoint_list(
     )
 
 
+def test_get_filtered_items_from_sharepoint_list(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    first_page = {
+        "value": [
+            {"id": "2", "fields": {"Title": "Gadget", "Status": "Open"}},
+            {"id": "4", "fields": {"Title": "Widget", "Status": "Open"}},
+        ],
+        "@odata.nextLink": "https://graph.microsoft.com/v1.0/next-items",
+    }
+    routes = {
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks/items": _create_graph_json_response(first_page),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "Tasks", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    items = authorized_lib.get_items_from_sharepoint_list(
+        "Tasks",
+        sharepoint_site,
+        filter="fields/Status eq 'Open'",
+        select_fields="Title, Status",
+        order_by="fields/Title",
+        top=2,
+    )
+
+    assert list(items) == [
+        {"object_id": "2", "Title": "Gadget", "Status": "Open"},
+        {"object_id": "4", "Title": "Widget", "Status": "Open"},
+    ]
+    item_calls = [c for c in request.call_args_list if "/items" in c.args[1]]
+    assert len(item_calls) == 1
+    assert item_calls[0].kwargs["params"] == {
+        "$top": 2,
+        "$expand": "fields($select=Title,Status)",
+        "$filter": "fields/Status eq 'Open'",
+        "$orderby": "fields/Title",
+    }
+    assert (
+        item_calls[0].kwargs["headers"]["Prefer"]
+        == "HonorNonIndexedQueriesWarningMayFailRandomly"
+    )
+
+
+def test_streaming_items_from_sharepoint_list_in_chunks(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    first_page = {
+        "value": [
+            {"id": "1", "fields": {"Title": "First"}},
+            {"id": "2", "fields": {"Title": "Second"}},
+        ],
+        "@odata.nextLink": "https://graph.microsoft.com/v1.0/next-items",
+    }
+    second_page = {"value": [{"id": "3", "fields": {"Title": "Third"}}]}
+    routes = {
+        "/next-items": _create_graph_json_response(second_page),
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks/items": _create_graph_json_response(first_page),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "Tasks", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    chunks = authorized_lib.get_items_from_sharepoint_list(
+        "Tasks",
+        sharepoint_site,
+        filter="fields/Title ne null",
+        stream=True,
+        chunk_size=2,
+    )
+
+    assert not any("/items" in c.args[1] for c in request.call_args_list)
+    assert [[row["Title"] for row in chunk] for chunk in chunks] == [
+        ["First", "Second"],
+        ["Third"],
+    ]
+    item_calls = [c for c in request.call_args_list if "items" in c.args[1]]
+    assert len(item_calls) == 2
+    assert all("Prefer" in c.kwargs["headers"] for c in item_calls)
+
+
+def test_get_items_from_sharepoint_list_as_columns(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    items_page = {
+        "value": [
+            {"id": "1", "fields": {"Title": "First"}},
+            {"id": "2", "fields": {"Status": "Open"}},
+            {"id": "3", "fields": {"Title": "Third", "Status": "Done"}},
+        ]
+    }
+    routes = {
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks/items": _create_graph_json_response(items_page),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "Tasks", "displayName": "Tasks"}
+        ),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    columns = authorized_lib.get_items_from_sharepoint_list(
+        "Tasks", sharepoint_site, as_columns=True
+    )
+
+    assert columns == {
+        "object_id": ["1", "2", "3"],
+        "Title": ["First", None, "Third"],
+        "Status": [None, "Open", "Done"],
+    }
+
+
+def test_syncing_sharepoint_list(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    state_file = TEMP_DIR / "tasks.snapshot.json"
+    state_file.unlink(missing_ok=True)
+    routes = {
+        "token=second": _create_graph_json_response(
+            {
+                "value": [
+                    {"id": "1", "fields": {"Title": "First", "Status": "Done"}},
+                    {"id": "2", "deleted": {"state": "deleted"}},
+                    {"id": "3", "fields": {"Title": "Third", "Status": "Open"}},
+                ],
+                "@odata.deltaLink": "https://graph.microsoft.com/v1.0/delta?token=third",
+            }
+        ),
+        "/items/delta": _create_graph_json_response(
+            {
+                "value": [
+                    {"id": "1", "fields": {"Title": "First", "Status": "Open"}},
+                    {"id": "2", "fields": {"Title": "Second", "Status": "Open"}},
+                ],
+                "@odata.deltaLink": "https://graph.microsoft.com/v1.0/delta?token=second",
+            }
+        ),
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "Tasks", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    _, first = authorized_lib.sync_sharepoint_list(
+        "Tasks", sharepoint_site, state_file, select_fields="Title,Status"
+    )
+    table, second = authorized_lib.sync_sharepoint_list(
+        "Tasks", sharepoint_site, state_file, select_fields="Title,Status"
+    )
+
+    assert [(c["change"], c["object_id"]) for c in first] == [
+        ("added", "1"),
+        ("added", "2"),
+    ]
+    assert [(c["change"], c["object_id"]) for c in second] == [
+        ("modified", "1"),
+        ("deleted", "2"),
+        ("added", "3"),
+    ]
+    assert table == [
+        {"object_id": "1", "Title": "First", "Status": "Done"},
+        {"object_id": "3", "Title": "Third", "Status": "Open"},
+    ]
+    delta_calls = [c for c in request.call_args_list if "delta" in c.args[1]]
+    assert delta_calls[0].kwargs["params"] == {
+        "$expand": "fields($select=Title,Status)"
+    }
+    assert "token=second" in delta_calls[1].args[1]
+    state = json.loads(state_file.read_text(encoding="utf-8"))
+    assert state["delta_link"].endswith("token=third")
+
+
+def test_add_items_to_sharepoint_list(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    first_batch = {
+        "responses": [
+            {"id": "1", "status": 201, "body": {"id": "11"}},
+            {"id": "2", "status": 429, "headers": {"Retry-After": "0"}, "body": {}},
+            {
+                "id": "3",
+                "status": 400,
+                "body": {"error": {"message": "Field 'Bad' is not recognized"}},
+            },
+        ]
+    }
+    second_batch = {"responses": [{"id": "2", "status": 201, "body": {"id": "12"}}]}
+    batch_response = _create_graph_json_response(first_batch)
+    batch_response.json.side_effect = [first_batch, second_batch]
+    routes = {
+        "/$batch": batch_response,
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "list-id", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    mocker.patch("RPA.MSGraph.time.sleep")
+    items = [
+        {"Title": "First"},
+        {"Title": "Second", "object_id": "ignored"},
+        {"Bad": "Third"},
+    ]
+
+    results = authorized_lib.add_items_to_sharepoint_list(
+        "Tasks", sharepoint_site, items
+    )
+
+    assert [(r["object_id"], r["status"], r["error"]) for r in results] == [
+        ("11", 201, None),
+        ("12", 201, None),
+        (None, 400, "Field 'Bad' is not recognized"),
+    ]
+    batches = [
+        c.kwargs["data"] for c in request.call_args_list if "/$batch" in c.args[1]
+    ]
+    sent = json.loads(batches[0])["requests"]
+    assert sent[1]["url"].endswith("/lists/list-id/items")
+    assert sent[1]["body"] == {"fields": {"Title": "Second"}}
+    assert len(json.loads(batches[1])["requests"]) == 1
+
+
+def test_added_items_are_not_resent_on_gateway_timeout(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    routes = {
+        "/$batch": _create_graph_json_response(
+            {
+                "responses": [
+                    {"id": "1", "status": 201, "body": {"id": "11"}},
+                    {"id": "2", "status": 504, "headers": {}, "body": {}},
+                ]
+            }
+        ),
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "list-id", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    mocker.patch("RPA.MSGraph.time.sleep")
+
+    results = authorized_lib.add_items_to_sharepoint_list(
+        "Tasks", sharepoint_site, [{"Title": "First"}, {"Title": "Second"}]
+    )
+
+    assert [r["status"] for r in results] == [201, 504]
+    batches = [c for c in request.call_args_list if "/$batch" in c.args[1]]
+    assert len(batches) == 1
+
+
+def test_update_sharepoint_list_items(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    routes = {
+        "/$batch": _create_graph_json_response(
+            {"responses": [{"id": "1", "status": 200, "body": {"Status": "Done"}}]}
+        ),
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "list-id", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+
+    results = authorized_lib.update_sharepoint_list_items(
+        "Tasks", sharepoint_site, [{"object_id": 7, "Status": "Done"}]
+    )
+
+    assert results == [{"index": 0, "object_id": "7", "status": 200, "error": None}]
+    sent = json.loads(request.call_args.kwargs["data"])["requests"][0]
+    assert sent["method"] == "PATCH"
+    assert sent["url"].endswith("/lists/list-id/items/7/fields")
+    assert sent["body"] == {"Status": "Done"}
+
+
+def test_update_sharepoint_list_items_from_fetched_items(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    fields = {
+        "@odata.etag": '"etag,3"',
+        "id": "7",
+        "Title": "Gizmo",
+        "Status": "Open",
+        "Created": "2024-01-01T00:00:00Z",
+        "Modified": "2024-01-02T00:00:00Z",
+        "AuthorLookupId": "12",
+        "EditorLookupId": "12",
+        "LinkTitle": "Gizmo",
+        "LinkTitleNoMenu": "Gizmo",
+        "ContentType": "Item",
+        "Attachments": False,
+        "Edit": "",
+        "_UIVersionString": "1.0",
+    }
+    routes = {
+        "/$batch": _create_graph_json_response(
+            {"responses": [{"id": "1", "status": 200, "body": {}}]}
+        ),
+        "/items": _create_graph_json_response(
+            {"value": [{"id": "7", "fields": fields}]}
+        ),
+        "/columns": _create_graph_json_response({"value": []}),
+        "/lists/Tasks": _create_graph_json_response(
+            {"id": "list-id", "displayName": "Tasks"}
+        ),
+    }
+    request = _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    items = authorized_lib.get_items_from_sharepoint_list("Tasks", sharepoint_site)
+    rows = [{**item, "Status": "Done"} for item in items]
+
+    authorized_lib.update_sharepoint_list_items("Tasks", sharepoint_site, rows)
+
+    sent = json.loads(request.call_args.kwargs["data"])["requests"][0]
+    assert sent["body"] == {"Title": "Gizmo", "Status": "Done"}
+
+
 def test_list_sharepoint_drives(
     authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
 ) -> None:
@@ -952,3 +2425,68 @@ def test_download_file_from_sharepoint(
 
     assert downloaded_file
     assert downloaded_file.exists()
+
+
+def test_download_file_from_sharepoint_in_segments(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    content = b"0123456789abcdefghij"
+    item = {"id": "big-id", "name": "big.bin", "size": len(content), "file": {}}
+    routes = {
+        "root:/Big/big.bin": _create_graph_json_response(item),
+        "/items/big-id": _create_graph_json_response(
+            {
+                **item,
+                "file": {"hashes": {"sha1Hash": hashlib.sha1(content).hexdigest()}},
+                "@microsoft.graph.downloadUrl": "https://download.example.com/big",
+            }
+        ),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    mocker.patch("RPA.MSGraph.DEFAULT_SEGMENT_SIZE", 8)
+
+    def respond_range(method: str, url: str, **kwargs) -> MagicMock:
+        start, end = kwargs["headers"]["Range"][len("bytes=") :].split("-")
+        response = _create_graph_download_response(content[int(start) : int(end) + 1])
+        response.__enter__.return_value.status_code = 206
+        return response
+
+    naive_session = MagicMock()
+    naive_session.request.side_effect = respond_range
+    authorized_lib.client.con.naive_session = naive_session
+
+    downloaded_file = authorized_lib.download_file_from_sharepoint(
+        "/Big/big.bin", sharepoint_site, TEMP_DIR, segment_threshold=10
+    )
+
+    assert downloaded_file.read_bytes() == content
+    ranges = sorted(
+        c.kwargs["headers"]["Range"] for c in naive_session.request.call_args_list
+    )
+    assert ranges == ["bytes=0-7", "bytes=16-19", "bytes=8-15"]
+
+
+def test_failed_segmented_download_leaves_no_file(
+    authorized_lib: MSGraph, mocker: MockerFixture, sharepoint_site: Site
+) -> None:
+    item = {"id": "bad-id", "name": "bad.bin", "size": 20, "file": {}}
+    destination = TEMP_DIR / "bad.bin"
+    destination.unlink(missing_ok=True)
+    routes = {
+        "root:/Big/bad.bin": _create_graph_json_response(item),
+        "/items/bad-id": _create_graph_json_response(
+            {**item, "@microsoft.graph.downloadUrl": "https://download.example.com/bad"}
+        ),
+    }
+    _patch_routed_graph_responses(authorized_lib, mocker, routes)
+    mocker.patch("RPA.MSGraph.DEFAULT_SEGMENT_SIZE", 8)
+    naive_session = MagicMock()
+    naive_session.request.return_value = _create_graph_download_response(b"x" * 20)
+    authorized_lib.client.con.naive_session = naive_session
+
+    with pytest.raises(MSGraphDownloadError):
+        authorized_lib.download_file_from_sharepoint(
+            "/Big/bad.bin", sharepoint_site, TEMP_DIR, segment_threshold=10
+        )
+
+    assert not list(TEMP_DIR.glob("bad.bin*"))